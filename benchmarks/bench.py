@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks every transliteration table on several kinds of input.
+
+    $ python benchmarks/bench.py --output before.json
+    $ python benchmarks/bench.py --output after.json
+    $ python benchmarks/bench.py --compare before.json after.json
+
+Runs offline, from a source checkout, with nothing but the standard library.
+"""
+
+from __future__ import unicode_literals, print_function
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from translitua import ALL_TRANSLITERATIONS, translit, translit_many  # noqa: E402
+
+PROSE = """Берег моря. Чути розбещенi крики морських птахiв, ревiння моржа,
+а також iншi звуки, iздаваємиє різною морською сволотою. Входить Гамлєт,
+вдягнутий в зручну приємну товстовку і такі ж самі парусинові штани.
+Гамлєт красиво підперезаний вузеньким шкіряним пояском.
+Він босий, бородатий і пацаватий. В руках у нього дебелий дрючок.
+Не выходи из комнаты, не совершай ошибку.
+Зачем тебе Солнце, если ты куришь Шипку?
+За дверью бессмысленно все, особенно - возглас счастья.
+Только в уборную - и сразу же возвращайся.
+"""
+
+NAMES = [
+    "Шевченко",
+    "Київ",
+    "Згуровський",
+    "Ярослав",
+    "Євгенія",
+    "Соловьёв",
+    "Подъячев",
+    "Щербаков",
+    "Юрій",
+    "Знам'янка",
+]
+
+INPUTS = {
+    "names": NAMES,
+    "prose": [PROSE],
+    "uppercase": [PROSE.upper()],
+    "apostrophes": ["П'ять м’ясних п'єс з'їли сім'ї В'ячеслава та Ф’ЮЗ'ЄВИХ " * 10],
+}
+
+
+def _measure(func, chars, min_time):
+    number = 1
+    while True:
+        elapsed = timeit.timeit(func, number=number)
+        if elapsed >= min_time:
+            break
+        number *= 2
+
+    best = min([elapsed] + timeit.repeat(func, number=number, repeat=2))
+    per_call = best / number
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "ops_per_sec": 1.0 / per_call,
+        "ns_per_char": per_call * 1e9 / max(chars, 1),
+        "peak_bytes": peak,
+    }
+
+
+def import_time(repeat=5):
+    """Best time of importing translitua in a fresh interpreter, in ms"""
+    code = (
+        "import time; t = time.perf_counter(); import translitua; "
+        "print((time.perf_counter() - t) * 1000)"
+    )
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    return min(
+        float(subprocess.check_output([sys.executable, "-c", code], cwd=root))
+        for _ in range(repeat)
+    )
+
+
+def run(tables, inputs, min_time):
+    results = {}
+
+    for table in tables:
+        for input_name in inputs:
+            items = INPUTS[input_name]
+            chars = sum(len(item) for item in items)
+
+            results["translit/%s/%s" % (table.__name__, input_name)] = _measure(
+                lambda: [translit(item, table) for item in items], chars, min_time
+            )
+            results["translit_many/%s/%s" % (table.__name__, input_name)] = _measure(
+                lambda: list(translit_many(items, table)), chars, min_time
+            )
+
+    return results
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)["results"]
+    with open(new_path) as f:
+        new = json.load(f)["results"]
+
+    print(
+        "%-70s %12s %12s %8s" % ("benchmark", "old ns/char", "new ns/char", "speedup")
+    )
+    for name in sorted(set(old) & set(new)):
+        before, after = old[name]["ns_per_char"], new[name]["ns_per_char"]
+        print("%-70s %12.1f %12.1f %7.2fx" % (name, before, after, before / after))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output", help="save results to this JSON file")
+    parser.add_argument(
+        "--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two JSON results"
+    )
+    parser.add_argument(
+        "--table",
+        action="append",
+        help="benchmark only these tables (may be repeated), all by default",
+    )
+    parser.add_argument(
+        "--input",
+        action="append",
+        choices=sorted(INPUTS),
+        help="benchmark only these inputs (may be repeated), all by default",
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.2,
+        help="minimal time of one measurement in seconds",
+    )
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    tables = [
+        t for t in ALL_TRANSLITERATIONS if not args.table or t.__name__ in args.table
+    ]
+    results = run(tables, args.input or sorted(INPUTS), args.min_time)
+
+    for name, res in sorted(results.items()):
+        print(
+            "%-70s %12.0f ops/s %8.1f ns/char %10d B"
+            % (name, res["ops_per_sec"], res["ns_per_char"], res["peak_bytes"])
+        )
+
+    import_ms = import_time()
+    print("%-70s %12.2f ms" % ("import translitua", import_ms))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "implementation": platform.python_implementation(),
+                    "import_ms": import_ms,
+                    "results": results,
+                },
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
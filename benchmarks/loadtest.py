@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+Load test of the transliteration HTTP server, table by table.
+
+    $ python benchmarks/loadtest.py
+    $ python benchmarks/loadtest.py --url http://127.0.0.1:8080 --connections 16
+    $ python benchmarks/loadtest.py --connections 64 --workers 4
+
+Without --url a server is started in this process on a free local port.
+Every connection is a keep-alive connection used by its own thread.
+Reports p50/p99 latency and throughput. Runs offline, from a source
+checkout, with nothing but the standard library.
+"""
+
+from __future__ import unicode_literals, print_function
+import argparse
+import http.client
+import json
+import os
+import sys
+import threading
+import timeit
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench import INPUTS  # noqa: E402
+from translitua import ALL_TRANSLITERATIONS  # noqa: E402
+from translitua.server import TranslitServer  # noqa: E402
+
+
+def _percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def _request_bodies(endpoint, table, items, batch_size):
+    if endpoint == "translit":
+        return [
+            json.dumps({"text": item, "table": table}).encode("utf-8") for item in items
+        ]
+
+    texts = (items * (batch_size // len(items) + 1))[:batch_size]
+    return [json.dumps({"texts": texts, "table": table}).encode("utf-8")]
+
+
+def run(host, port, table, endpoint, items, connections, requests, batch_size):
+    bodies = _request_bodies(endpoint, table, items, batch_size)
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker(count):
+        conn = http.client.HTTPConnection(host, port)
+        mine = []
+        try:
+            for i in range(count):
+                started = timeit.default_timer()
+                conn.request(
+                    "POST",
+                    "/" + endpoint,
+                    bodies[i % len(bodies)],
+                    {"Content-Type": "application/json"},
+                )
+                response = conn.getresponse()
+                response.read()
+                mine.append(timeit.default_timer() - started)
+                if response.status != 200:
+                    raise RuntimeError("HTTP %d" % response.status)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            conn.close()
+            with lock:
+                latencies.extend(mine)
+
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(requests // connections + (i < requests % connections),),
+        )
+        for i in range(connections)
+    ]
+    started = timeit.default_timer()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = timeit.default_timer() - started
+
+    if errors:
+        raise errors[0]
+
+    latencies.sort()
+    return {
+        "p50_ms": _percentile(latencies, 0.5) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "requests_per_sec": len(latencies) / elapsed,
+        "strings_per_sec": len(latencies)
+        * (batch_size if endpoint == "batch" else 1)
+        / elapsed,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", help="server to test, an in-process one by default")
+    parser.add_argument(
+        "--table",
+        action="append",
+        help="test only these tables (may be repeated), all by default",
+    )
+    parser.add_argument(
+        "--endpoint",
+        choices=["translit", "batch"],
+        default="translit",
+        help="endpoint to call, translit by default",
+    )
+    parser.add_argument(
+        "--input", choices=sorted(INPUTS), default="names", help="strings to send"
+    )
+    parser.add_argument(
+        "--connections", type=int, default=8, help="number of concurrent connections"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="number of worker threads of the in-process server",
+    )
+    parser.add_argument(
+        "--requests", type=int, default=2000, help="number of requests per table"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=100, help="number of strings per batch"
+    )
+    parser.add_argument(
+        "--output", help="save results to this JSON file, keyed by table"
+    )
+    args = parser.parse_args(argv)
+
+    server = thread = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        server = TranslitServer(("127.0.0.1", 0), workers=args.workers, quiet=True)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        host, port = "127.0.0.1", server.server_port
+
+    tables = [
+        t.__name__
+        for t in ALL_TRANSLITERATIONS
+        if not args.table or t.__name__ in args.table
+    ]
+    results = {}
+
+    try:
+        print(
+            "%-40s %10s %10s %12s %12s"
+            % ("table", "p50 ms", "p99 ms", "requests/s", "strings/s")
+        )
+        for table in tables:
+            res = results[table] = run(
+                host,
+                port,
+                table,
+                args.endpoint,
+                INPUTS[args.input],
+                args.connections,
+                args.requests,
+                args.batch_size,
+            )
+            print(
+                "%-40s %10.2f %10.2f %12.0f %12.0f"
+                % (
+                    table,
+                    res["p50_ms"],
+                    res["p99_ms"],
+                    res["requests_per_sec"],
+                    res["strings_per_sec"],
+                )
+            )
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Scaling of translit_threaded from one thread to many.
+
+    $ python benchmarks/threads.py
+    $ python3.13t benchmarks/threads.py --threads 1 2 4 8 --table RussianSimple
+
+Every run transliterates the same list of strings, compiled tables are
+shared by all threads. Threads only run in parallel on free-threaded
+builds of Python; with the GIL the speedup stays close to 1x. Runs
+offline, from a source checkout, with nothing but the standard library.
+"""
+
+from __future__ import unicode_literals, print_function
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench import INPUTS  # noqa: E402
+from translitua import get_compiled, get_table, translit_threaded  # noqa: E402
+
+
+def _gil_enabled():
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+def run(items, table, threads, chunksize, repeat):
+    best = None
+    for _ in range(repeat):
+        started = timeit.default_timer()
+        for _ in translit_threaded(items, table, threads=threads, chunksize=chunksize):
+            pass
+        elapsed = timeit.default_timer() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+def main(argv=None):
+    cpus = multiprocessing.cpu_count()
+    default_threads = [1]
+    while default_threads[-1] * 2 <= cpus:
+        default_threads.append(default_threads[-1] * 2)
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--table", default="UkrainianKMU", help="table to use, UkrainianKMU by default"
+    )
+    parser.add_argument(
+        "--input", choices=sorted(INPUTS), default="prose", help="strings to use"
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        nargs="+",
+        default=default_threads,
+        help="thread counts to try, powers of two up to the CPU count by default",
+    )
+    parser.add_argument(
+        "--strings", type=int, default=20000, help="number of strings per run"
+    )
+    parser.add_argument(
+        "--chunksize", type=int, default=500, help="number of strings per chunk"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="runs per thread count, best is kept"
+    )
+    parser.add_argument("--output", help="save results to this JSON file")
+    args = parser.parse_args(argv)
+
+    table = get_table(args.table)
+    get_compiled(table)
+    sample = INPUTS[args.input]
+    items = (sample * (args.strings // len(sample) + 1))[: args.strings]
+    chars = sum(len(item) for item in items)
+
+    print(
+        "%s, GIL %s, %d CPUs"
+        % (sys.version.split()[0], "enabled" if _gil_enabled() else "disabled", cpus)
+    )
+    print("%8s %12s %14s %8s" % ("threads", "seconds", "chars/s", "speedup"))
+
+    results = {}
+    baseline = None
+    for threads in args.threads:
+        elapsed = run(items, table, threads, args.chunksize, args.repeat)
+        baseline = baseline or elapsed
+        results[threads] = {
+            "seconds": elapsed,
+            "chars_per_sec": chars / elapsed,
+            "speedup": baseline / elapsed,
+        }
+        print(
+            "%8d %12.4f %14.0f %7.2fx"
+            % (threads, elapsed, chars / elapsed, baseline / elapsed)
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -57,4 +57,16 @@ setup(
     ],
 
     package_data={'': ['LICENSE']},
+
+    extras_require={
+        'pandas': ['numpy', 'pandas'],
+        'arrow': ['numpy', 'pyarrow'],
+    },
+
+    entry_points={
+        'console_scripts': [
+            'translitua=translitua.cli:main',
+            'translitua-server=translitua.server:main',
+        ],
+    },
 )
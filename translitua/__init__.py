@@ -1,3 +1,4 @@
 __version__ = '1.3.2'
 
 from .translit import *
+from .reverse import ReverseIndex, translit_reverse
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+asyncio front end for translit. Concurrent calls are gathered into small
+batches that run in an executor, so a large payload never blocks the event
+loop. Requires Python 3.5+.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import asyncio
+from collections import OrderedDict
+
+from .translit import UkrainianKMU, get_compiled, get_table, text_type
+
+_get_running_loop = getattr(asyncio, "get_running_loop", asyncio.get_event_loop)
+
+
+def _translit_batch(table, items, preserve_case):
+    return get_compiled(table).translit_batch(items, preserve_case)
+
+
+class AsyncTransliterator(object):
+    """
+    Transliterates concurrent ``await transliterator.translit(src)`` calls
+    in micro-batches. A batch is started as soon as a call arrives and
+    waits at most `max_delay` seconds for more calls, up to
+    `max_batch_size` strings. Strings of a batch are grouped by table and
+    run through the batch engine in `executor` (a thread pool by default;
+    a process pool works as well for the built-in tables). Results are
+    exactly the same as those of translit.
+
+    At most `max_in_flight` batches run at once, and at most
+    `max_queue_size` calls wait for a batch. Further calls wait in
+    translit until there is room, which keeps memory bounded under load.
+
+    >>> async def main():
+    ...     async with AsyncTransliterator(max_delay=0.01) as transliterator:
+    ...         return await asyncio.gather(
+    ...             transliterator.translit(u"Київ"),
+    ...             transliterator.translit(u"ЗГУРОВСЬКИЙ"),
+    ...             transliterator.translit(u"Москва", "RussianSimple"),
+    ...         )
+    >>> print(asyncio.run(main()))
+    ['Kyiv', 'ZGHUROVSKYI', 'Moskva']
+    """
+
+    def __init__(
+        self,
+        executor=None,
+        max_batch_size=1000,
+        max_delay=0.001,
+        max_queue_size=10000,
+        max_in_flight=2,
+    ):
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.max_queue_size = max_queue_size
+        self.max_in_flight = max_in_flight
+
+        self._queue = None
+        self._slots = None
+        self._dispatcher = None
+        self._batches = set()
+        self._closed = False
+
+    async def translit(self, src, table=UkrainianKMU, preserve_case=True):
+        """Same as translit, but runs in a batch in the executor
+
+        :param src: string to transliterate
+        :param table: transliteration table or its name
+        :param preserve_case: same as for translit
+        :type preserve_case: bool
+        :returns: transliterated string
+        """
+        if self._closed:
+            raise RuntimeError("AsyncTransliterator is closed")
+        if isinstance(table, text_type):
+            table = get_table(table)
+
+        if self._dispatcher is None:
+            self._queue = asyncio.Queue(self.max_queue_size)
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+            self._dispatcher = _get_running_loop().create_task(self._dispatch())
+
+        future = _get_running_loop().create_future()
+        await self._queue.put((table, preserve_case, text_type(src), future))
+
+        return await future
+
+    async def _dispatch(self):
+        loop = _get_running_loop()
+
+        while True:
+            # While all slots are busy calls pile up in the queue and make
+            # the next batch bigger
+            await self._slots.acquire()
+            batch = [await self._queue.get()]
+
+            if self._queue.qsize() < self.max_batch_size - 1:
+                await asyncio.sleep(self.max_delay)
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            task = loop.create_task(self._run(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run(self, batch):
+        loop = _get_running_loop()
+        groups = OrderedDict()
+        for table, preserve_case, src, future in batch:
+            # Callers that were cancelled meanwhile don't need a result
+            if not future.done():
+                groups.setdefault((table, preserve_case), []).append((src, future))
+
+        async def run_group(table, preserve_case, requests):
+            try:
+                results = await loop.run_in_executor(
+                    self.executor,
+                    _translit_batch,
+                    table,
+                    [src for src, _ in requests],
+                    preserve_case,
+                )
+            except Exception as e:
+                for _, future in requests:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future), res in zip(requests, results):
+                    if not future.done():
+                        future.set_result(res)
+
+        try:
+            await asyncio.gather(
+                *[
+                    run_group(table, preserve_case, requests)
+                    for (table, preserve_case), requests in groups.items()
+                ]
+            )
+        finally:
+            self._slots.release()
+            for _ in batch:
+                self._queue.task_done()
+
+    async def close(self):
+        """Waits for all pending calls and stops the dispatcher"""
+        self._closed = True
+        if self._dispatcher is None:
+            return
+
+        await self._queue.join()
+        self._dispatcher.cancel()
+        try:
+            await self._dispatcher
+        except asyncio.CancelledError:
+            pass
+        self._dispatcher = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+# Attribute of the event loop that holds its AsyncTransliterator. A mapping
+# from loops would keep every loop alive, as the transliterator's dispatcher
+# task refers to its loop
+_LOOP_ATTRIBUTE = "_translitua_transliterator"
+
+
+async def translit_async(src, table=UkrainianKMU, preserve_case=True):
+    """Same as translit, but doesn't block the event loop. Calls share one
+    AsyncTransliterator with default settings per event loop.
+
+    :param src: string to transliterate
+    :param table: transliteration table or its name
+    :param preserve_case: same as for translit
+    :type preserve_case: bool
+    :returns: transliterated string
+
+    >>> print(asyncio.run(translit_async(u"Львів")))
+    Lviv
+    """
+    loop = _get_running_loop()
+    transliterator = getattr(loop, _LOOP_ATTRIBUTE, None)
+    if transliterator is None:
+        transliterator = AsyncTransliterator()
+        setattr(loop, _LOOP_ATTRIBUTE, transliterator)
+
+    return await transliterator.translit(src, table, preserve_case)
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Transliteration of Apache Arrow string arrays and Parquet files. Requires
+numpy and pyarrow, which are not dependencies of translitua itself.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from .translit import UkrainianKMU, get_compiled, get_table, text_type
+
+# Offsets of string arrays are int32, more data takes a large_string array
+_MAX_STRING_OFFSET = 2**31 - 1
+
+
+def _translit_python(compiled, array, preserve_case):
+    values = array.to_pylist()
+    todo = [i for i, v in enumerate(values) if v is not None]
+    for i, res in zip(
+        todo, compiled.translit_batch([values[i] for i in todo], preserve_case)
+    ):
+        values[i] = res
+
+    return pa.array(values, type=pa.string())
+
+
+def _translit_buffers(compiled, array, preserve_case):
+    """
+    Transliterates a non-empty string or large_string array without
+    creating a str per value: the UTF-8 data is copied with NUL bytes
+    between values, decoded once, run through the table and split back on
+    the NUL bytes. The result is a large_string array only if its data
+    doesn't fit a string array
+    """
+    n = len(array)
+    offsets = np.frombuffer(
+        array.buffers()[1],
+        dtype=np.int64 if pa.types.is_large_string(array.type) else np.int32,
+    )
+    offsets = offsets[array.offset : array.offset + n + 1]
+    data = array.buffers()[2]
+    data = (
+        np.frombuffer(data, dtype=np.uint8)
+        if data is not None
+        else np.zeros(0, np.uint8)
+    )
+    data = data[offsets[0] : offsets[-1]]
+
+    if not compiled.batch_safe or (data == 0).any():
+        return _translit_python(compiled, array, preserve_case)
+
+    # Every byte moves right by the number of values before it
+    joined = np.zeros(len(data) + n - 1, dtype=np.uint8)
+    joined[np.arange(len(data)) + np.repeat(np.arange(n), np.diff(offsets))] = data
+
+    text = joined.tobytes().decode("utf-8")
+    if compiled.triggers is None or compiled.triggers.search(text):
+        for sub, repl in compiled.passes:
+            text = sub(repl, text)
+    out = np.frombuffer(
+        text.translate(compiled.translate_table).encode("utf-8"), np.uint8
+    )
+
+    size = len(out) - (n - 1)
+    if size > _MAX_STRING_OFFSET:
+        result_type, offset_type = pa.large_string(), np.int64
+    else:
+        result_type, offset_type = pa.string(), np.int32
+
+    # Each separator shifts the ends of the following values left by one
+    separators = np.flatnonzero(out == 0)
+    new_offsets = np.empty(n + 1, dtype=offset_type)
+    new_offsets[0] = 0
+    new_offsets[1:-1] = separators - np.arange(n - 1)
+    new_offsets[-1] = size
+
+    result = pa.Array.from_buffers(
+        result_type,
+        n,
+        [
+            None,
+            pa.py_buffer(new_offsets.tobytes()),
+            pa.py_buffer(out[out != 0].tobytes()),
+        ],
+    )
+
+    if preserve_case:
+        upper = pc.fill_null(pc.utf8_is_upper(array), False)
+        if pc.any(upper).as_py():
+            uppercased = [v.upper() for v in pc.filter(result, upper).to_pylist()]
+            result = pc.replace_with_mask(
+                result, upper, pa.array(uppercased, result_type)
+            )
+
+    if array.null_count:
+        result = pc.if_else(array.is_null(), pa.scalar(None, result_type), result)
+
+    return result
+
+
+def _is_string_type(type_):
+    if pa.types.is_dictionary(type_):
+        type_ = type_.value_type
+
+    return pa.types.is_string(type_) or pa.types.is_large_string(type_)
+
+
+def _result_type(type_):
+    """Type of translit_arrow's result for an array of `type_`"""
+    if pa.types.is_dictionary(type_):
+        return pa.dictionary(type_.index_type, pa.string(), type_.ordered)
+
+    return pa.string()
+
+
+def translit_arrow(array, table=UkrainianKMU, preserve_case=True):
+    """Transliterates an Arrow string array (or chunked array) and returns
+    a new string array. Nulls stay nulls. Of a dictionary array only the
+    dictionary is transliterated.
+
+    The UTF-8 data buffer is transliterated as a whole, so only the
+    uppercased values (see preserve_case) are turned into Python strings.
+    Arrays whose data contains NUL characters are done value by value.
+    Results with more than 2 GB of data, which string arrays can't hold,
+    come back as large_string arrays.
+
+    :param array: pyarrow string, large_string or dictionary of strings
+        array
+    :param table: transliteration table or its name
+    :param preserve_case: same as for translit
+    :type preserve_case: bool
+    :returns: pyarrow string array (large_string over 2 GB), or
+        dictionary array for a dictionary array
+    :raises ValueError: for arrays of other types
+
+    >>> print(translit_arrow(pa.array([u"Київ", None, u"ЯЛТА", u"з'їзд"])).to_pylist())
+    ['Kyiv', None, 'YALTA', 'zizd']
+    >>> translit_arrow(pa.array([1, 2]))
+    Traceback (most recent call last):
+    ...
+    ValueError: Not a string array: int64
+    """
+    if isinstance(table, text_type):
+        table = get_table(table)
+    compiled = get_compiled(table)
+
+    if not _is_string_type(array.type):
+        raise ValueError("Not a string array: %s" % array.type)
+
+    if isinstance(array, pa.ChunkedArray):
+        return pa.chunked_array(
+            [translit_arrow(chunk, table, preserve_case) for chunk in array.chunks],
+            type=_result_type(array.type),
+        )
+
+    if pa.types.is_dictionary(array.type):
+        return pa.DictionaryArray.from_arrays(
+            array.indices,
+            translit_arrow(array.dictionary, table, preserve_case),
+            ordered=array.type.ordered,
+        )
+
+    if not len(array):
+        return array.cast(pa.string())
+
+    return _translit_buffers(compiled, array, preserve_case)
+
+
+def translit_parquet(
+    source,
+    destination,
+    columns,
+    table=UkrainianKMU,
+    preserve_case=True,
+    batch_size=65536,
+):
+    """Copies Parquet file `source` to `destination`, transliterating the
+    given string columns. The file is processed record batch by record
+    batch, so memory use is bounded by `batch_size` rows.
+
+    The schema of the file, with its metadata, is kept as it is, except
+    that the given columns become string columns (or dictionaries of
+    strings) if they were large_string ones.
+
+    :param source: path or file object of the Parquet file to read
+    :param destination: path or file object of the Parquet file to write
+    :param columns: names of the columns to transliterate
+    :param table: transliteration table or its name
+    :param preserve_case: same as for translit
+    :type preserve_case: bool
+    :param batch_size: number of rows read at once
+    :type batch_size: int
+    :raises ValueError: when a column is missing or isn't a string column
+    """
+    parquet_file = pq.ParquetFile(source)
+    schema = parquet_file.schema_arrow
+
+    columns = set(columns)
+    for name in sorted(columns):
+        if schema.get_field_index(name) == -1:
+            raise ValueError("Unknown column: %r" % (name,))
+        if not _is_string_type(schema.field(name).type):
+            raise ValueError(
+                "Not a string column: %r (%s)" % (name, schema.field(name).type)
+            )
+    for i, field in enumerate(schema):
+        if field.name in columns:
+            schema = schema.set(i, field.with_type(_result_type(field.type)))
+
+    writer = pq.ParquetWriter(destination, schema)
+    try:
+        for batch in parquet_file.iter_batches(batch_size=batch_size):
+            arrays = [
+                (
+                    translit_arrow(column, table, preserve_case)
+                    if name in columns
+                    else column
+                )
+                for name, column in zip(batch.schema.names, batch.columns)
+            ]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+    finally:
+        writer.close()
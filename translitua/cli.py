@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import argparse
+import io
+import sys
+
+from .translit import (
+    ALL_TRANSLITERATIONS,
+    get_table,
+    translit_many,
+    translit_parallel,
+)
+
+TABLE_NAMES = sorted(table.__name__ for table in ALL_TRANSLITERATIONS)
+
+
+def _open(path, mode, encoding):
+    if path == "-":
+        fileno = sys.stdin.fileno() if mode == "r" else sys.stdout.fileno()
+        return io.open(fileno, mode, encoding=encoding, newline="", closefd=False)
+
+    return io.open(path, mode, encoding=encoding, newline="")
+
+
+def _positive_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid int value: %r" % (value,))
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be at least 1, got %d" % number)
+
+    return number
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="translitua",
+        description="Transliterates text line by line using one of the "
+        "Ukrainian or russian transliteration tables",
+    )
+    parser.add_argument(
+        "input", nargs="?", default="-", help="input file, stdin by default"
+    )
+    parser.add_argument(
+        "-o", "--output", default="-", help="output file, stdout by default"
+    )
+    parser.add_argument(
+        "-t",
+        "--table",
+        default="UkrainianKMU",
+        choices=TABLE_NAMES,
+        metavar="TABLE",
+        help="transliteration table, UkrainianKMU by default. One of: %s"
+        % ", ".join(TABLE_NAMES),
+    )
+    parser.add_argument(
+        "--no-preserve-case",
+        dest="preserve_case",
+        action="store_false",
+        help="don't uppercase the result for uppercased lines",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=_positive_int,
+        default=1,
+        help="number of worker processes, 1 by default",
+    )
+    parser.add_argument(
+        "--shard-size",
+        type=_positive_int,
+        default=10000,
+        help="number of lines sent to a worker at once",
+    )
+    parser.add_argument(
+        "--encoding", default="utf-8", help="encoding of input and output"
+    )
+    args = parser.parse_args(argv)
+
+    table = get_table(args.table)
+
+    with _open(args.input, "r", args.encoding) as fin:
+        with _open(args.output, "w", args.encoding) as fout:
+            if args.workers > 1:
+                lines = translit_parallel(
+                    fin,
+                    table,
+                    preserve_case=args.preserve_case,
+                    processes=args.workers,
+                    chunksize=args.shard_size,
+                )
+            else:
+                lines = translit_many(fin, table, preserve_case=args.preserve_case)
+
+            fout.writelines(lines)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Transliteration of whole NumPy arrays and pandas columns. Requires numpy
+and pandas, which are not dependencies of translitua itself. Importing
+this module registers the ``translit`` accessor on pandas Series.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import numpy as np
+import pandas as pd
+
+from .translit import UkrainianKMU, get_compiled, get_table, text_type
+
+
+def translit_array(values, table=UkrainianKMU, preserve_case=True):
+    """Transliterates every string of a NumPy array (or any sequence) and
+    returns a new array of the same shape. Nulls and other non-string
+    values are kept as they are, as are strings without a single
+    character the table would change. The remaining strings go through
+    the batch engine in one go.
+
+    :param values: array of strings
+    :param table: transliteration table or its name
+    :param preserve_case: same as for translit
+    :type preserve_case: bool
+    :returns: array of transliterated strings, of object dtype unless
+        `values` was a NumPy unicode array
+
+    >>> print(", ".join(translit_array(np.array([u"Київ", u"ID-42"]))))
+    Kyiv, ID-42
+    >>> for value in translit_array([u"Львів", None, float("nan")], "UkrainianKMU"):
+    ...     print(value)
+    Lviv
+    None
+    nan
+    """
+    if isinstance(table, text_type):
+        table = get_table(table)
+    compiled = get_compiled(table)
+
+    array = np.asarray(values)
+    flat = array.ravel().astype(object)
+
+    if compiled.changes is None:
+        todo = [i for i, v in enumerate(flat) if isinstance(v, text_type)]
+    else:
+        search = compiled.changes.search
+        todo = [i for i, v in enumerate(flat) if isinstance(v, text_type) and search(v)]
+
+    result = flat.copy()
+    if todo:
+        result[todo] = np.array(
+            compiled.translit_batch(list(flat[todo]), preserve_case), dtype=object
+        )
+
+    result = result.reshape(array.shape)
+    if array.dtype.kind == "U":
+        return result.astype(text_type)
+
+    return result
+
+
+@pd.api.extensions.register_series_accessor("translit")
+class TranslitAccessor(object):
+    """
+    ``series.translit(table="UkrainianKMU")`` returns a new Series with
+    transliterated values, see translit_array
+
+    >>> s = pd.Series([u"Шевченко", None, u"Franko"], name="name")
+    >>> res = s.translit(table="UkrainianKMU")
+    >>> print("%s %s %s" % (res[0], res.isna()[1], res[2]))
+    Shevchenko True Franko
+    """
+
+    def __init__(self, series):
+        self._series = series
+
+    def __call__(self, table=UkrainianKMU, preserve_case=True):
+        values = translit_array(
+            self._series.to_numpy(dtype=object), table, preserve_case
+        )
+        return pd.Series(values, index=self._series.index, name=self._series.name)
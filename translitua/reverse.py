@@ -0,0 +1,388 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import heapq
+import math
+
+from .translit import (
+    ALL_RUSSIAN,
+    ALL_TRANSLITERATIONS,
+    ALL_UKRAINIAN,
+    get_compiled,
+    text_type,
+)
+
+try:
+    unichr
+except NameError:
+    unichr = chr
+
+# Score of a character that no table produces, kept as is
+_UNKNOWN_SCORE = -10.0
+# Added to the score of every segment, so longer matches are preferred
+_SEGMENT_SCORE = -1.0
+# Score of every inserted letter that the table drops (e.g. "ь")
+_DELETED_SCORE = -1.0
+# Score of a letter where the spelling rules don't expect it
+_MISPLACED_SCORE = -3.0
+# Score of a letter where the spelling rules allow it, but rarely
+_RARE_SCORE = -1.0
+# Candidates kept per position of the text for every table
+_BEAM_WIDTH = 20
+
+_CONSONANTS = set("бвгґджзклмнпрстфхцчшщ")
+_VOWELS = set("аеєиіїоуюяыэё")
+# Consonants never followed by ы
+_HUSHING = set("жчшщ")
+# Letters after which а, у and э are written as я, ю and е
+_IOTATING = set("ьъйиі")
+
+
+def _is_cyrillic(c):
+    return "\u0400" <= c <= "\u04ff"
+
+
+def _context_score(prev, cyrillic, word_end=False):
+    """
+    Scores a segment by the letter before it, "" at a word start. Soft and
+    hard signs only follow consonants, й and ї don't follow them, і rarely
+    follows a vowel, ы neither follows a vowel, ж, ч, ш and щ nor starts a
+    word and no vowel follows it, ґ is rare anywhere. After ь, ъ, й and
+    front vowels а, у and э are rare, as the sound is then written with я,
+    ю and е. и rarely follows a vowel and hardly ever at the end of a
+    word, where й is written (Андрій, Николай). Words rarely end with й
+    and a consonant, where ї is mostly written instead (Миколаїв, Київ).
+
+    >>> print("%s %s" % (_context_score(u"т", u"ь"), _context_score(u"о", u"ь")))
+    0.0 None
+    >>> print("%s %s" % (_context_score(u"", u"ї"), _context_score(u"к", u"ї")))
+    0.0 -3.0
+    >>> print("%s %s" % (_context_score(u"й", u"в"), _context_score(u"й", u"в", True)))
+    0.0 -3.0
+    >>> print("%s %s" % (_context_score(u"а", u"и"), _context_score(u"а", u"и", True)))
+    -1.0 -3.0
+    """
+    if word_end:
+        last = (prev + cyrillic)[-2:]
+        if last[:1] == "й" and last[1:] in _CONSONANTS:
+            return _MISPLACED_SCORE
+        if last[:1] in _VOWELS and last[1:] == "и":
+            return _MISPLACED_SCORE
+
+    first = cyrillic[:1]
+    if prev == "ы" and first in _VOWELS:
+        return _MISPLACED_SCORE
+    if prev in _IOTATING and first in ("а", "у", "э"):
+        return _MISPLACED_SCORE
+    if first in ("ь", "ъ"):
+        return 0.0 if prev in _CONSONANTS else None
+    if first in ("й", "ї"):
+        return _MISPLACED_SCORE if prev in _CONSONANTS else 0.0
+    if first == "і":
+        return _MISPLACED_SCORE if prev in _VOWELS else 0.0
+    if first == "и":
+        return _RARE_SCORE if prev in _VOWELS else 0.0
+    if first == "ы":
+        return 0.0 if prev in _CONSONANTS - _HUSHING else _MISPLACED_SCORE
+    if first == "ґ":
+        return _RARE_SCORE
+
+    return 0.0
+
+
+def _lower(src):
+    """
+    Lowercases `src` character by character, keeping characters whose
+    lowercase is longer (e.g. "İ"), so positions still match `src`
+
+    >>> print(len(_lower(u"İstanbul")))
+    8
+    """
+    return "".join(c if len(c.lower()) != 1 else c.lower() for c in src)
+
+
+def _language(table):
+    if table in ALL_UKRAINIAN:
+        return "uk"
+    if table in ALL_RUSSIAN:
+        return "ru"
+
+    return None
+
+
+def _build_trie(options):
+    """
+    Turns {latin: set of cyrillic} into a trie of dicts, where the None
+    key of a node holds the sorted cyrillic options for the latin text
+    leading to it
+
+    >>> trie = _build_trie({"sh": {"ш", "сх"}})
+    >>> print(", ".join(trie["s"]["h"][None]))
+    сх, ш
+    """
+    trie = {}
+    for latin, cyrillic in options.items():
+        node = trie
+        for c in latin:
+            node = node.setdefault(c, {})
+        node[None] = sorted(cyrillic)
+
+    return trie
+
+
+def _case_styles(src):
+    """
+    Tells for every character of `src` how to case the cyrillic written
+    for it: "upper" within uppercased words, "title" for other capitals
+
+    >>> print(" ".join(_case_styles(u"Ab CD")))
+    title lower lower upper upper
+    """
+    styles = []
+    start = 0
+    while start < len(src):
+        end = start + 1
+        if src[start].isalpha():
+            while end < len(src) and src[end].isalpha():
+                end += 1
+        word = src[start:end]
+        if len(word) > 1 and word.isupper():
+            styles.extend(["upper"] * len(word))
+        else:
+            styles.extend("title" if c.isupper() else "lower" for c in word)
+        start = end
+
+    return styles
+
+
+def _apply_case(style, cyrillic):
+    if style == "upper":
+        return cyrillic.upper()
+    if style == "title":
+        return cyrillic[:1].upper() + cyrillic[1:]
+
+    return cyrillic
+
+
+class ReverseIndex(object):
+    """
+    Maps latin text back to cyrillic candidates using the tables' main
+    translit tables, special cases and first characters. Latin text is
+    decoded separately for every table, segmenting it with a trie of that
+    table's outputs, so a candidate never mixes the alphabets or the
+    spellings of different tables. Candidates that the table doesn't turn
+    back into the same latin text are dropped.
+
+    Candidates are ranked by the share of the tables of every language
+    they are found with, out of the tables of that language that write
+    every letter of the text, so languages with more tables or with more
+    spellings don't outvote the others. Letters in places the spelling
+    rules don't expect them and inserted letters the tables drop lower
+    the rank. Dynamic programming keeps only the best candidates per
+    position, so the cost is linear in the length of the text.
+
+    >>> index = ReverseIndex()
+    >>> print(", ".join(index.candidates(u"Shevchenko", limit=1)))
+    Шевченко
+    >>> print(", ".join(index.candidates(u"Shchukin", limit=2)))
+    Щукин, Щукін
+    >>> print(u"Харків" in index.candidates(u"Kharkiv", limit=3))
+    True
+    >>> print(u"Львів" in index.candidates(u"Lviv", limit=10))
+    True
+    >>> print(", ".join(index.candidates(u"Taras SHEVCHENKO", limit=1)))
+    Тарас ШЕВЧЕНКО
+    >>> print(", ".join(index.candidates(u"Kyiv", limit=1)))
+    Київ
+    >>> print(", ".join(index.candidates(u"Mykolaiv", limit=1)))
+    Миколаїв
+    >>> print(index.candidates(u"İstanbul", limit=1)[0][1:])
+    станбул
+    """
+
+    def __init__(self, tables=ALL_TRANSLITERATIONS):
+        # (table, its language, trie, trie for word starts, letters the
+        # table drops)
+        self.tables = []
+
+        for table in tables:
+            main = {}
+            first_characters = {}
+            deleted = set()
+
+            def add(target, latin, cyrillic):
+                latin = latin.lower()
+                if latin and cyrillic == cyrillic.lower():
+                    target.setdefault(latin, set()).add(cyrillic)
+
+            for code, latin in table.MAIN_TRANSLIT_TABLE.items():
+                add(main, latin, unichr(code))
+                if not latin and _is_cyrillic(unichr(code)):
+                    deleted.add(unichr(code).lower())
+            for cyrillic in getattr(table, "_DELETE_CASES", []):
+                if _is_cyrillic(cyrillic):
+                    deleted.add(cyrillic.lower())
+            for cyrillic, latin in getattr(table, "SPECIAL_CASES", {}).items():
+                add(main, latin, cyrillic)
+            for cyrillic, latin in getattr(table, "FIRST_CHARACTERS", {}).items():
+                add(first_characters, latin, cyrillic)
+
+            # At word starts the first characters replace what the main
+            # table writes for them
+            initial = {}
+            for latin, options in main.items():
+                options = options - set(first_characters)
+                if options:
+                    initial[latin] = options
+            for latin, options in first_characters.items():
+                initial.setdefault(latin, set()).update(options)
+
+            self.tables.append(
+                (
+                    table,
+                    _language(table),
+                    _build_trie(main),
+                    _build_trie(initial),
+                    sorted(deleted),
+                )
+            )
+
+    def _segments(self, text, start, trie):
+        node = trie
+        for end in range(start, len(text)):
+            node = node.get(text[end])
+            if node is None:
+                return
+            if None in node:
+                yield end + 1, node[None]
+
+    def _decode(self, src, text, styles, trie, initial_trie, deleted):
+        """
+        Returns (score, cyrillic, cased cyrillic) for the best ways to
+        write `text` with one table
+        """
+        # best[i] holds the best (score, cyrillic, cased) for text[:i]
+        best = [[] for _ in range(len(text) + 1)]
+        best[0] = [(0.0, "", "")]
+
+        for start in range(len(text)):
+            if not best[start]:
+                continue
+            best[start] = heapq.nlargest(_BEAM_WIDTH, set(best[start]))
+
+            word_start = start == 0 or not text[start - 1].isalpha()
+            found = False
+
+            segments = self._segments(text, start, initial_trie if word_start else trie)
+            for end, options in segments:
+                found = True
+                word_end = end == len(text) or not text[end].isalpha()
+                for cyrillic in options:
+                    cased = _apply_case(styles[start], cyrillic)
+                    for prefix_score, prefix, cased_prefix in best[start]:
+                        score = _context_score(
+                            "" if word_start else prefix[-1:], cyrillic, word_end
+                        )
+                        if score is None:
+                            continue
+                        score += prefix_score + _SEGMENT_SCORE
+                        best[end].append(
+                            (score, prefix + cyrillic, cased_prefix + cased)
+                        )
+
+                        for dropped in deleted:
+                            dropped_score = _context_score(cyrillic[-1:], dropped)
+                            if dropped_score is None:
+                                continue
+                            best[end].append(
+                                (
+                                    score + dropped_score + _DELETED_SCORE,
+                                    prefix + cyrillic + dropped,
+                                    cased_prefix
+                                    + cased
+                                    + _apply_case(
+                                        (
+                                            "upper"
+                                            if styles[start] == "upper"
+                                            else "lower"
+                                        ),
+                                        dropped,
+                                    ),
+                                )
+                            )
+
+            if not found:
+                for prefix_score, prefix, cased_prefix in best[start]:
+                    best[start + 1].append(
+                        (
+                            prefix_score
+                            + (_UNKNOWN_SCORE if text[start].isalpha() else 0.0),
+                            prefix + text[start],
+                            cased_prefix + src[start],
+                        )
+                    )
+
+        return set(best[-1])
+
+    def candidates(self, src, limit=10):
+        """
+        Returns up to `limit` cyrillic candidates for `src`, best first
+        """
+        src = text_type(src)
+        text = _lower(src)
+        styles = _case_styles(src)
+
+        # cased cyrillic: [{language: number of tables}, score]
+        found = {}
+        # language: [number of tables that write every letter of the text,
+        # number of tables that write some of them]
+        writers = {}
+        for table, language, trie, initial_trie, deleted in self.tables:
+            compiled = get_compiled(table)
+            written = complete = False
+            for score, cyrillic, cased in self._decode(
+                src, text, styles, trie, initial_trie, deleted
+            ):
+                if _lower(compiled(cyrillic)) != text:
+                    continue
+                written = True
+                complete = complete or all(
+                    _is_cyrillic(c) for c in cyrillic if c.isalpha()
+                )
+                entry = found.get(cased)
+                if entry is None:
+                    entry = found[cased] = [{}, score]
+                entry[0][language] = entry[0].get(language, 0) + 1
+            if written:
+                counts = writers.setdefault(language, [0, 0])
+                counts[0] += complete
+                counts[1] += 1
+
+        def rank(item):
+            cased, (votes, score) = item
+            share = sum(
+                float(count) / (writers[language][0] or writers[language][1])
+                for language, count in votes.items()
+            )
+            return -(math.log(share) + score), cased
+
+        ranked = sorted(found.items(), key=rank)
+
+        return [cased for cased, _ in ranked[:limit]]
+
+
+_INDEXES = {}
+
+
+def translit_reverse(src, tables=ALL_TRANSLITERATIONS, limit=10):
+    """Returns up to `limit` cyrillic candidates for latin `src`, best
+    first. The ReverseIndex for the given tables is built once and reused.
+
+    >>> print(", ".join(translit_reverse(u"Yaroslav", limit=1)))
+    Ярослав
+    """
+    key = tuple(tables)
+    index = _INDEXES.get(key)
+    if index is None:
+        index = _INDEXES[key] = ReverseIndex(tables)
+
+    return index.candidates(src, limit)
@@ -0,0 +1,506 @@
+# -*- coding: utf-8 -*-
+"""
+Transliteration over HTTP, using nothing but the standard library.
+
+    $ python -m translitua.server --port 8080 --workers 16
+
+Endpoints:
+
+    GET  /tables                      names of all tables
+    GET  /translit?text=...&table=... transliterate one string
+    POST /translit  {"text": ..., "table": ..., "preserve_case": ...}
+    POST /batch     {"texts": [...], "table": ..., "preserve_case": ...}
+    POST /all       {"text": ..., "tables": [...], "preserve_case": ...}
+
+POST /batch also accepts an ``application/x-ndjson`` body with one JSON
+string per line (table and preserve_case go to the query string), and
+sends the results back the same way. Results are kept in a temporary
+file until the whole body is read, so the body may be of any size.
+
+Connections are kept alive. Idle ones wait in a selector, and a fixed pool
+of worker threads serves requests as they arrive, so any number of idle
+connections can be held open. Every table is compiled before the server
+starts listening.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import argparse
+import json
+import selectors
+import socket
+import tempfile
+import threading
+import timeit
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from . import __version__
+from .translit import (
+    ALL_TRANSLITERATIONS,
+    get_table,
+    translit,
+    translit_all,
+    translit_many,
+    warm_up,
+)
+
+# Size of reads from the request body and of writes of NDJSON responses
+_BLOCK_SIZE = 65536
+# NDJSON results above that many bytes wait for the response on disk
+_SPOOL_SIZE = 8 * 1024 * 1024
+
+
+class BadRequest(ValueError):
+    """Raised for malformed requests, turned into a 4xx response"""
+
+    def __init__(self, message, status=400):
+        ValueError.__init__(self, message)
+        self.status = status
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    if value in ("1", "true", "yes"):
+        return True
+    if value in ("0", "false", "no"):
+        return False
+
+    raise BadRequest("Invalid boolean: %r" % (value,))
+
+
+def _parse_text(value, field="text"):
+    if not isinstance(value, str):
+        raise BadRequest("String expected in %s, got %r" % (field, value))
+
+    return value
+
+
+def _parse_table(name):
+    try:
+        return get_table(name)
+    except KeyError as e:
+        raise BadRequest(e.args[0])
+
+
+class TranslitRequestHandler(BaseHTTPRequestHandler):
+    """Serves the endpoints listed in the module docstring"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "translitua/" + __version__
+    # Requests that stall half way give their worker back after that long
+    timeout = 30
+    # Headers and body are written separately, which Nagle's algorithm
+    # would delay until the client acknowledges the headers
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._dispatch({"/tables": self._get_tables, "/translit": self._get_translit})
+
+    def do_POST(self):
+        self._dispatch(
+            {
+                "/translit": self._post_translit,
+                "/batch": self._post_batch,
+                "/all": self._post_all,
+            }
+        )
+
+    def _dispatch(self, routes):
+        url = urlsplit(self.path)
+        self.query = dict(
+            (key, values[-1]) for key, values in parse_qs(url.query).items()
+        )
+        handler = routes.get(url.path)
+
+        try:
+            if handler is None:
+                raise BadRequest("Not found: %s" % url.path, 404)
+            handler()
+        except BadRequest as e:
+            self._send_json({"error": e.args[0]}, e.status)
+
+    def _send_json(self, obj, status=200):
+        body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if status >= 400:
+            # The request body may be left unread, so the connection can't
+            # be reused
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body_blocks(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            while True:
+                line = self.rfile.readline()
+                try:
+                    size = int(line.split(b";")[0], 16)
+                except ValueError:
+                    raise BadRequest("Invalid chunk size: %r" % (line,))
+                if not size:
+                    # Trailers end with an empty line
+                    while self.rfile.readline().strip():
+                        pass
+                    return
+                yield self.rfile.read(size)
+                self.rfile.readline()
+
+        length = self.headers.get("Content-Length")
+        if length is None:
+            raise BadRequest("Content-Length required", 411)
+
+        try:
+            remaining = int(length)
+        except ValueError:
+            remaining = -1
+        if remaining < 0:
+            raise BadRequest("Invalid Content-Length: %r" % (length,))
+
+        while remaining > 0:
+            block = self.rfile.read(min(remaining, _BLOCK_SIZE))
+            if not block:
+                raise BadRequest("Request body is truncated")
+            remaining -= len(block)
+            yield block
+
+    def _body_lines(self):
+        tail = b""
+        for block in self._body_blocks():
+            lines = (tail + block).split(b"\n")
+            tail = lines.pop()
+            for line in lines:
+                yield line
+        yield tail
+
+    def _read_json(self):
+        body = b"".join(self._body_blocks())
+        try:
+            request = json.loads(body.decode("utf-8"))
+        except ValueError as e:
+            raise BadRequest("Invalid JSON: %s" % e)
+        if not isinstance(request, dict):
+            raise BadRequest("JSON object expected")
+
+        return request
+
+    def _get_tables(self):
+        self._send_json({"tables": [table.__name__ for table in ALL_TRANSLITERATIONS]})
+
+    def _get_translit(self):
+        if "text" not in self.query:
+            raise BadRequest("Missing parameter: text")
+
+        self._send_json(
+            {
+                "result": translit(
+                    self.query["text"],
+                    _parse_table(self.query.get("table", "UkrainianKMU")),
+                    _parse_bool(self.query.get("preserve_case", True)),
+                )
+            }
+        )
+
+    def _post_translit(self):
+        request = self._read_json()
+        if "text" not in request:
+            raise BadRequest("Missing field: text")
+
+        self._send_json(
+            {
+                "result": translit(
+                    _parse_text(request["text"]),
+                    _parse_table(request.get("table", "UkrainianKMU")),
+                    _parse_bool(request.get("preserve_case", True)),
+                )
+            }
+        )
+
+    def _post_all(self):
+        request = self._read_json()
+        if "text" not in request:
+            raise BadRequest("Missing field: text")
+
+        tables = ALL_TRANSLITERATIONS
+        if "tables" in request:
+            if not isinstance(request["tables"], list):
+                raise BadRequest("List expected in tables")
+            tables = [_parse_table(name) for name in request["tables"]]
+
+        self._send_json(
+            {
+                "results": translit_all(
+                    _parse_text(request["text"]),
+                    tables,
+                    _parse_bool(request.get("preserve_case", True)),
+                )
+            }
+        )
+
+    def _post_batch(self):
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip()
+        if content_type == "application/x-ndjson":
+            return self._post_batch_ndjson()
+
+        request = self._read_json()
+        texts = request.get("texts")
+        if not isinstance(texts, list):
+            raise BadRequest("Missing field: texts")
+        texts = [_parse_text(text, "texts") for text in texts]
+
+        self._send_json(
+            {
+                "results": list(
+                    translit_many(
+                        texts,
+                        _parse_table(request.get("table", "UkrainianKMU")),
+                        _parse_bool(request.get("preserve_case", True)),
+                    )
+                )
+            }
+        )
+
+    def _post_batch_ndjson(self):
+        table = _parse_table(self.query.get("table", "UkrainianKMU"))
+        preserve_case = _parse_bool(self.query.get("preserve_case", True))
+
+        def texts():
+            for line in self._body_lines():
+                if line.strip():
+                    yield _parse_text(json.loads(line.decode("utf-8")), "line")
+
+        # The whole body is read before the response starts: clients that
+        # send all of it before reading anything would otherwise deadlock
+        # with the server once the socket buffers fill up. Results wait in
+        # a file spooled to disk above _SPOOL_SIZE meanwhile
+        with tempfile.SpooledTemporaryFile(_SPOOL_SIZE) as spool:
+            buf = []
+            size = 0
+            try:
+                for res in translit_many(texts(), table, preserve_case):
+                    line = json.dumps(res, ensure_ascii=False) + "\n"
+                    buf.append(line.encode("utf-8"))
+                    size += len(buf[-1])
+                    if size >= _BLOCK_SIZE:
+                        spool.write(b"".join(buf))
+                        buf, size = [], 0
+            except BadRequest:
+                raise
+            except ValueError as e:
+                raise BadRequest("Invalid JSON: %s" % e)
+            spool.write(b"".join(buf))
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+            self.send_header("Content-Length", str(spool.tell()))
+            self.end_headers()
+
+            spool.seek(0)
+            for block in iter(lambda: spool.read(_BLOCK_SIZE), b""):
+                self.wfile.write(block)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+class TranslitServer(HTTPServer):
+    """
+    HTTP server with `workers` threads serving requests. Connections
+    between requests are parked in a selector and handed to a worker
+    when the next request arrives, so idle keep-alive connections don't
+    hold workers. Connections idle for `idle_timeout` seconds are closed.
+
+    >>> import threading, urllib.request
+    >>> server = TranslitServer(("127.0.0.1", 0), workers=2, quiet=True)
+    >>> thread = threading.Thread(target=server.serve_forever)
+    >>> thread.start()
+    >>> url = "http://127.0.0.1:%d/translit?text=%%D0%%9A%%D0%%B8%%D1%%97%%D0%%B2"
+    >>> print(urllib.request.urlopen(url % server.server_port).read().decode())
+    {"result": "Kyiv"}
+
+    More idle keep-alive connections than workers:
+
+    >>> import http.client
+    >>> def get(conn):
+    ...     conn.request("GET", "/translit?text=%D0%9B%D1%8C%D0%B2%D1%96%D0%B2")
+    ...     return conn.getresponse().read().decode()
+    >>> idle = [http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=5)
+    ...         for _ in range(3)]
+    >>> for conn in idle:
+    ...     print(get(conn))
+    {"result": "Lviv"}
+    {"result": "Lviv"}
+    {"result": "Lviv"}
+    >>> print(get(idle[0]))
+    {"result": "Lviv"}
+    >>> for conn in idle:
+    ...     conn.close()
+
+    An NDJSON body of several megabytes, sent in full before the response
+    is read:
+
+    >>> line = json.dumps(u"Щ" * 100, ensure_ascii=False) + "\\n"
+    >>> body = line.encode("utf-8") * 25000
+    >>> conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+    >>> conn.request("POST", "/batch", body, {"Content-Type": "application/x-ndjson"})
+    >>> lines = conn.getresponse().read().decode("utf-8").splitlines()
+    >>> print(len(body) > 5000000, len(lines), lines[-1] == json.dumps(u"SHCH" * 100))
+    True 25000 True
+    >>> conn.close()
+    >>> server.shutdown()
+    >>> server.server_close()
+    >>> thread.join()
+    """
+
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        server_address,
+        workers=8,
+        quiet=False,
+        handler_class=TranslitRequestHandler,
+        idle_timeout=60,
+    ):
+        warm_up()
+        self.quiet = quiet
+        self.idle_timeout = idle_timeout
+        self.pool = ThreadPoolExecutor(workers)
+        HTTPServer.__init__(self, server_address, handler_class)
+
+        # Handlers waiting to be parked, only the poller thread touches the
+        # selector itself
+        self._to_park = deque()
+        self._closed = False
+        self._selector = selectors.DefaultSelector()
+        self._wakeup, self._wakeup_write = socket.socketpair()
+        self._selector.register(self._wakeup, selectors.EVENT_READ)
+        self._poller = threading.Thread(target=self._poll)
+        self._poller.daemon = True
+        self._poller.start()
+
+    def process_request(self, request, client_address):
+        # Handlers are set up by hand, as their constructor would serve
+        # the connection until it is closed
+        handler = self.RequestHandlerClass.__new__(self.RequestHandlerClass)
+        handler.request = request
+        handler.client_address = client_address
+        handler.server = self
+        handler.setup()
+        self._park(handler)
+
+    def _park(self, handler):
+        if self._closed:
+            return self._close(handler)
+
+        self._to_park.append(handler)
+        self._wakeup_write.send(b"\0")
+
+    def _poll(self):
+        deadlines = {}
+        while not self._closed:
+            for key, _ in self._selector.select(min(self.idle_timeout, 1)):
+                if key.fileobj is self._wakeup:
+                    self._wakeup.recv(4096)
+                    continue
+                self._selector.unregister(key.fileobj)
+                del deadlines[key.data]
+                self.pool.submit(self._serve, key.data)
+
+            while self._to_park:
+                handler = self._to_park.popleft()
+                self._selector.register(
+                    handler.connection, selectors.EVENT_READ, handler
+                )
+                deadlines[handler] = timeit.default_timer() + self.idle_timeout
+
+            now = timeit.default_timer()
+            for handler, deadline in list(deadlines.items()):
+                if deadline < now or self._closed:
+                    self._selector.unregister(handler.connection)
+                    del deadlines[handler]
+                    self._close(handler)
+
+    def _serve(self, handler):
+        try:
+            while True:
+                handler.close_connection = True
+                handler.handle_one_request()
+                if handler.close_connection:
+                    return self._close(handler)
+                if not self._has_buffered(handler):
+                    return self._park(handler)
+        except Exception:
+            self.handle_error(handler.request, handler.client_address)
+            self._close(handler)
+
+    def _has_buffered(self, handler):
+        # Pipelined requests may already be read into rfile, where the
+        # selector doesn't see them
+        timeout = handler.connection.gettimeout()
+        handler.connection.settimeout(0)
+        try:
+            return bool(handler.rfile.peek(1))
+        finally:
+            handler.connection.settimeout(timeout)
+
+    def _close(self, handler):
+        try:
+            handler.finish()
+        finally:
+            self.shutdown_request(handler.request)
+
+    def server_close(self):
+        HTTPServer.server_close(self)
+        self._closed = True
+        self._wakeup_write.send(b"\0")
+        self._poller.join()
+        while self._to_park:
+            self._close(self._to_park.popleft())
+        self._selector.close()
+        self._wakeup.close()
+        self._wakeup_write.close()
+        self.pool.shutdown(wait=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="translitua-server", description="Serves transliteration over HTTP"
+    )
+    parser.add_argument(
+        "--host", default="127.0.0.1", help="address to listen on, 127.0.0.1 by default"
+    )
+    parser.add_argument(
+        "--port", type=int, default=8080, help="port to listen on, 8080 by default"
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=8,
+        help="number of requests served at once, 8 by default",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="don't log every request"
+    )
+    args = parser.parse_args(argv)
+
+    server = TranslitServer(
+        (args.host, args.port), workers=args.workers, quiet=args.quiet
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
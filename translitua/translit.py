@@ -2,11 +2,22 @@
 from __future__ import unicode_literals
 import re
 import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, namedtuple
+from itertools import chain, islice, repeat
 
 if sys.version < "3":
     text_type = unicode
 else:
     text_type = str
+    unichr = chr
+
+_WORD_CHAR = re.compile(r"(?u)\w")
+_BATCH_SEPARATOR = "\x00"
+_timer = getattr(time, "perf_counter", time.time)
 
 
 def add_uppercase(table):
@@ -49,6 +60,120 @@ def convert_table(table):
     return dict((ord(k), v) for k, v in table.items())
 
 
+def override_table(table, changes):
+    """
+    Returns a copy of the table with `changes` applied. Keys mapped to
+    None are removed
+
+    >>> print(override_table({"а": "a", "б": "b"}, {"б": "p"}) == {"а": "a", "б": "p"})
+    True
+    >>> print(override_table({"а": "a", "б": "b"}, {"б": None}) == {"а": "a"})
+    True
+    """
+    res = table.copy()
+    for k, v in changes.items():
+        if v is None:
+            res.pop(k, None)
+        else:
+            res[k] = v
+
+    return res
+
+
+def shared_builder(source):
+    """
+    Makes a lazy_attribute builder share its result between all tables
+    with the very same `source` attribute, e.g. a derived table that
+    doesn't override a table of its base
+
+    >>> build = shared_builder("_SPECIAL_CASES")(build_special_cases)
+    >>> class Base(object):
+    ...     _SPECIAL_CASES = {"зг": "zgh"}
+    >>> class Derived(Base):
+    ...     pass
+    >>> print(build(Base) is build(Derived))
+    True
+    """
+
+    def decorator(builder):
+        # id of the source -> (source, result), the source is kept alive so
+        # its id is never reused
+        built = {}
+
+        def build(table):
+            data = getattr(table, source)
+            if id(data) not in built:
+                built[id(data)] = (data, builder(table))
+
+            return built[id(data)][1]
+
+        build.__doc__ = builder.__doc__
+        return build
+
+    return decorator
+
+
+class lazy_attribute(object):
+    """
+    Class attribute that is built by `builder(cls)` on first access and
+    then kept for that class, so tables cost nothing until they are used.
+    Every class gets its own value, so a derived table is built from its
+    own data rather than inheriting the value of its base
+
+    >>> class Table(object):
+    ...     _SPECIAL_CASES = {"зг": "zgh"}
+    ...     SPECIAL_CASES = lazy_attribute(build_special_cases)
+    >>> class Derived(Table):
+    ...     _SPECIAL_CASES = {"зг": "zh"}
+    >>> print("%s %s" % (Table.SPECIAL_CASES["Зг"], Derived.SPECIAL_CASES["Зг"]))
+    Zgh Zh
+    >>> print(Table.SPECIAL_CASES is Table.SPECIAL_CASES)
+    True
+    """
+
+    def __init__(self, builder):
+        self.builder = builder
+        self.__doc__ = builder.__doc__
+        self._values = {}
+
+    def __get__(self, instance, owner):
+        try:
+            return self._values[owner]
+        except KeyError:
+            value = self._values[owner] = self.builder(owner)
+            return value
+
+
+@shared_builder("_MAIN_TRANSLIT_TABLE")
+def build_main_translit_table(table):
+    return convert_table(add_uppercase(table._MAIN_TRANSLIT_TABLE))
+
+
+@shared_builder("_SPECIAL_CASES")
+def build_special_cases(table):
+    return add_uppercase(table._SPECIAL_CASES)
+
+
+@shared_builder("_FIRST_CHARACTERS")
+def build_first_characters(table):
+    return add_uppercase(table._FIRST_CHARACTERS)
+
+
+@shared_builder("SPECIAL_CASES")
+def build_pattern1(table):
+    return re.compile("(?mu)" + "|".join(table.SPECIAL_CASES.keys()))
+
+
+@shared_builder("FIRST_CHARACTERS")
+def build_pattern2(table):
+    return re.compile("(?mu)" + r"\b(" + "|".join(table.FIRST_CHARACTERS.keys()) + ")")
+
+
+@shared_builder("_DELETE_CASES")
+def build_delete_pattern(table):
+    return re.compile("(?mu)" + "|".join(table._DELETE_CASES))
+
+
 class UkrainianKMU(object):
     """
     According to National system from
@@ -105,13 +230,13 @@ class UkrainianKMU(object):
 
     _FIRST_CHARACTERS = {"є": "ye", "ї": "yi", "й": "y", "ю": "yu", "я": "ya"}
 
-    MAIN_TRANSLIT_TABLE = convert_table(add_uppercase(_MAIN_TRANSLIT_TABLE))
-    FIRST_CHARACTERS = add_uppercase(_FIRST_CHARACTERS)
-    SPECIAL_CASES = add_uppercase(_SPECIAL_CASES)
+    MAIN_TRANSLIT_TABLE = lazy_attribute(build_main_translit_table)
+    FIRST_CHARACTERS = lazy_attribute(build_first_characters)
+    SPECIAL_CASES = lazy_attribute(build_special_cases)
 
-    PATTERN1 = re.compile("(?mu)" + "|".join(SPECIAL_CASES.keys()))
-    PATTERN2 = re.compile("(?mu)" + r"\b(" + "|".join(FIRST_CHARACTERS.keys()) + ")")
-    DELETE_PATTERN = re.compile("(?mu)" + "|".join(_DELETE_CASES))
+    PATTERN1 = lazy_attribute(build_pattern1)
+    PATTERN2 = lazy_attribute(build_pattern2)
+    DELETE_PATTERN = lazy_attribute(build_delete_pattern)
 
 
 class UkrainianSimple(object):
@@ -156,7 +281,7 @@ class UkrainianSimple(object):
         "я": "ja",
     }
 
-    MAIN_TRANSLIT_TABLE = convert_table(add_uppercase(_MAIN_TRANSLIT_TABLE))
+    MAIN_TRANSLIT_TABLE = lazy_attribute(build_main_translit_table)
 
 
 class RussianSimple(object):
@@ -201,7 +326,7 @@ class RussianSimple(object):
         "я": "ja",
     }
 
-    MAIN_TRANSLIT_TABLE = convert_table(add_uppercase(_MAIN_TRANSLIT_TABLE))
+    MAIN_TRANSLIT_TABLE = lazy_attribute(build_main_translit_table)
 
 
 class UkrainianWWS(object):
@@ -249,7 +374,7 @@ class UkrainianWWS(object):
         "\u02BC": "",
     }
 
-    MAIN_TRANSLIT_TABLE = convert_table(add_uppercase(_MAIN_TRANSLIT_TABLE))
+    MAIN_TRANSLIT_TABLE = lazy_attribute(build_main_translit_table)
 
 
 class RussianGOST2006(object):
@@ -297,7 +422,7 @@ class RussianGOST2006(object):
         "я": "ia",
     }
 
-    MAIN_TRANSLIT_TABLE = convert_table(add_uppercase(_MAIN_TRANSLIT_TABLE))
+    MAIN_TRANSLIT_TABLE = lazy_attribute(build_main_translit_table)
 
 
 class UkrainianBritish(object):
@@ -345,52 +470,23 @@ class UkrainianBritish(object):
         "\u02BC": "",
     }
 
-    MAIN_TRANSLIT_TABLE = convert_table(add_uppercase(_MAIN_TRANSLIT_TABLE))
+    MAIN_TRANSLIT_TABLE = lazy_attribute(build_main_translit_table)
 
 
-class UkrainianBGN(object):
+class UkrainianBGN(UkrainianSimple):
     """
     According to BGN system from
     https://en.wikipedia.org/wiki/Romanization_of_Ukrainian#Tables_of_romanization_systems
     """
 
-    _MAIN_TRANSLIT_TABLE = {
-        "а": "a",
-        "б": "b",
-        "в": "v",
-        "г": "h",
-        "ґ": "g",
-        "д": "d",
-        "е": "e",
-        "є": "ye",
-        "ж": "zh",
-        "з": "z",
-        "и": "y",
-        "і": "i",
-        "ї": "yi",
-        "й": "y",
-        "к": "k",
-        "л": "l",
-        "м": "m",
-        "н": "n",
-        "о": "o",
-        "п": "p",
-        "р": "r",
-        "с": "s",
-        "т": "t",
-        "у": "u",
-        "ф": "f",
-        "х": "kh",
-        "ц": "ts",
-        "ч": "ch",
-        "ш": "sh",
-        "щ": "shch",
-        "ь": "'",
-        "ю": "yu",
-        "я": "ya",
-    }
-
-    MAIN_TRANSLIT_TABLE = convert_table(add_uppercase(_MAIN_TRANSLIT_TABLE))
+    _MAIN_TRANSLIT_TABLE = override_table(
+        UkrainianSimple._MAIN_TRANSLIT_TABLE,
+        {
+            "й": "y",
+            "ю": "yu",
+            "я": "ya",
+        },
+    )
 
 
 class UkrainianISO9(object):
@@ -435,7 +531,7 @@ class UkrainianISO9(object):
         "я": "â",
     }
 
-    MAIN_TRANSLIT_TABLE = convert_table(add_uppercase(_MAIN_TRANSLIT_TABLE))
+    MAIN_TRANSLIT_TABLE = lazy_attribute(build_main_translit_table)
 
 
 class UkrainianFrench(object):
@@ -483,7 +579,7 @@ class UkrainianFrench(object):
         "\u02BC": "",
     }
 
-    MAIN_TRANSLIT_TABLE = convert_table(add_uppercase(_MAIN_TRANSLIT_TABLE))
+    MAIN_TRANSLIT_TABLE = lazy_attribute(build_main_translit_table)
 
 
 class UkrainianGerman(object):
@@ -531,7 +627,7 @@ class UkrainianGerman(object):
         "\u02BC": "",
     }
 
-    MAIN_TRANSLIT_TABLE = convert_table(add_uppercase(_MAIN_TRANSLIT_TABLE))
+    MAIN_TRANSLIT_TABLE = lazy_attribute(build_main_translit_table)
 
 
 class UkrainianGOST1971(object):
@@ -576,7 +672,7 @@ class UkrainianGOST1971(object):
         "я": "ja",
     }
 
-    MAIN_TRANSLIT_TABLE = convert_table(add_uppercase(_MAIN_TRANSLIT_TABLE))
+    MAIN_TRANSLIT_TABLE = lazy_attribute(build_main_translit_table)
 
 
 class UkrainianGOST1986(object):
@@ -624,7 +720,7 @@ class UkrainianGOST1986(object):
         "\u02BC": "",
     }
 
-    MAIN_TRANSLIT_TABLE = convert_table(add_uppercase(_MAIN_TRANSLIT_TABLE))
+    MAIN_TRANSLIT_TABLE = lazy_attribute(build_main_translit_table)
 
 
 class UkrainianPassport2007(object):
@@ -672,7 +768,7 @@ class UkrainianPassport2007(object):
         "\u02BC": "",
     }
 
-    MAIN_TRANSLIT_TABLE = convert_table(add_uppercase(_MAIN_TRANSLIT_TABLE))
+    MAIN_TRANSLIT_TABLE = lazy_attribute(build_main_translit_table)
 
 
 class UkrainianNational1996(object):
@@ -724,12 +820,12 @@ class UkrainianNational1996(object):
 
     _FIRST_CHARACTERS = {"є": "ye", "ї": "yi", "й": "y", "ю": "yu", "я": "ya"}
 
-    MAIN_TRANSLIT_TABLE = convert_table(add_uppercase(_MAIN_TRANSLIT_TABLE))
-    FIRST_CHARACTERS = add_uppercase(_FIRST_CHARACTERS)
-    SPECIAL_CASES = add_uppercase(_SPECIAL_CASES)
+    MAIN_TRANSLIT_TABLE = lazy_attribute(build_main_translit_table)
+    FIRST_CHARACTERS = lazy_attribute(build_first_characters)
+    SPECIAL_CASES = lazy_attribute(build_special_cases)
 
-    PATTERN1 = re.compile("(?mu)" + "|".join(SPECIAL_CASES.keys()))
-    PATTERN2 = re.compile("(?mu)" + r"\b(" + "|".join(FIRST_CHARACTERS.keys()) + ")")
+    PATTERN1 = lazy_attribute(build_pattern1)
+    PATTERN2 = lazy_attribute(build_pattern2)
 
 
 class UkrainianPassport2004Alt(object):
@@ -781,15 +877,15 @@ class UkrainianPassport2004Alt(object):
 
     _FIRST_CHARACTERS = {"є": "ye", "ї": "yi", "й": "y", "ю": "yu", "я": "ya"}
 
-    MAIN_TRANSLIT_TABLE = convert_table(add_uppercase(_MAIN_TRANSLIT_TABLE))
-    FIRST_CHARACTERS = add_uppercase(_FIRST_CHARACTERS)
-    SPECIAL_CASES = add_uppercase(_SPECIAL_CASES)
+    MAIN_TRANSLIT_TABLE = lazy_attribute(build_main_translit_table)
+    FIRST_CHARACTERS = lazy_attribute(build_first_characters)
+    SPECIAL_CASES = lazy_attribute(build_special_cases)
 
-    PATTERN1 = re.compile("(?mu)" + "|".join(SPECIAL_CASES.keys()))
-    PATTERN2 = re.compile("(?mu)" + r"\b(" + "|".join(FIRST_CHARACTERS.keys()) + ")")
+    PATTERN1 = lazy_attribute(build_pattern1)
+    PATTERN2 = lazy_attribute(build_pattern2)
 
 
-class RussianICAO(object):
+class RussianICAO(RussianGOST2006):
     """
     According to https://ru.wikipedia.org/wiki/%D0%A2%D1%80%D0%B0%D0%BD%D1%81%D0%BB%D0%B8%D1%82%D0%B5%D1%80%D0%B0%D1%86%D0%B8%D1%8F_%D1%80%D1%83%D1%81%D1%81%D0%BA%D0%BE%D0%B3%D0%BE_%D0%B0%D0%BB%D1%84%D0%B0%D0%B2%D0%B8%D1%82%D0%B0_%D0%BB%D0%B0%D1%82%D0%B8%D0%BD%D0%B8%D1%86%D0%B5%D0%B9#.D0.A1.D1.80.D0.B0.D0.B2.D0.BD.D0.B8.D1.82.D0.B5.D0.BB.D1.8C.D0.BD.D0.B0.D1.8F_.D1.82.D0.B0.D0.B1.D0.BB.D0.B8.D1.86.D0.B0_.D1.81.D0.B8.D1.81.D1.82.D0.B5.D0.BC_.D1.82.D1.80.D0.B0.D0.BD.D1.81.D0.BB.D0.B8.D1.82.D0.B5.D1.80.D0.B0.D1.86.D0.B8.D0.B8
     (Doc 9303, ICAO)
@@ -799,43 +895,13 @@ class RussianICAO(object):
     Приказ МИД N 4271 (2016-н/в)
     """
 
-    _MAIN_TRANSLIT_TABLE = {
-        "а": "a",
-        "б": "b",
-        "в": "v",
-        "г": "g",
-        "д": "d",
-        "е": "e",
-        "ё": "e",
-        "ж": "zh",
-        "з": "z",
-        "и": "i",
-        "й": "i",
-        "к": "k",
-        "л": "l",
-        "м": "m",
-        "н": "n",
-        "о": "o",
-        "п": "p",
-        "р": "r",
-        "с": "s",
-        "т": "t",
-        "у": "u",
-        "ф": "f",
-        "х": "kh",
-        "ц": "ts",
-        "ч": "ch",
-        "ш": "sh",
-        "щ": "shch",
-        "ъ": "ie",
-        "ы": "y",
-        "ь": "",
-        "э": "e",
-        "ю": "iu",
-        "я": "ia",
-    }
-
-    MAIN_TRANSLIT_TABLE = convert_table(add_uppercase(_MAIN_TRANSLIT_TABLE))
+    _MAIN_TRANSLIT_TABLE = override_table(
+        RussianGOST2006._MAIN_TRANSLIT_TABLE,
+        {
+            "ц": "ts",
+            "ъ": "ie",
+        },
+    )
 
 
 class RussianISOR9Table2(object):
@@ -880,52 +946,24 @@ class RussianISOR9Table2(object):
         "я": "ja",
     }
 
-    MAIN_TRANSLIT_TABLE = convert_table(add_uppercase(_MAIN_TRANSLIT_TABLE))
+    MAIN_TRANSLIT_TABLE = lazy_attribute(build_main_translit_table)
 
 
-class RussianTelegram(object):
+class RussianTelegram(RussianGOST2006):
     """
     According to https://ru.wikipedia.org/wiki/%D0%A2%D1%80%D0%B0%D0%BD%D1%81%D0%BB%D0%B8%D1%82%D0%B5%D1%80%D0%B0%D1%86%D0%B8%D1%8F_%D1%80%D1%83%D1%81%D1%81%D0%BA%D0%BE%D0%B3%D0%BE_%D0%B0%D0%BB%D1%84%D0%B0%D0%B2%D0%B8%D1%82%D0%B0_%D0%BB%D0%B0%D1%82%D0%B8%D0%BD%D0%B8%D1%86%D0%B5%D0%B9#.D0.A1.D1.80.D0.B0.D0.B2.D0.BD.D0.B8.D1.82.D0.B5.D0.BB.D1.8C.D0.BD.D0.B0.D1.8F_.D1.82.D0.B0.D0.B1.D0.BB.D0.B8.D1.86.D0.B0_.D1.81.D0.B8.D1.81.D1.82.D0.B5.D0.BC_.D1.82.D1.80.D0.B0.D0.BD.D1.81.D0.BB.D0.B8.D1.82.D0.B5.D1.80.D0.B0.D1.86.D0.B8.D0.B8
     (telegrams)
     """
 
-    _MAIN_TRANSLIT_TABLE = {
-        "а": "a",
-        "б": "b",
-        "в": "v",
-        "г": "g",
-        "д": "d",
-        "е": "e",
-        "ё": "e",
-        "ж": "j",
-        "з": "z",
-        "и": "i",
-        "й": "i",
-        "к": "k",
-        "л": "l",
-        "м": "m",
-        "н": "n",
-        "о": "o",
-        "п": "p",
-        "р": "r",
-        "с": "s",
-        "т": "t",
-        "у": "u",
-        "ф": "f",
-        "х": "h",
-        "ц": "c",
-        "ч": "ch",
-        "ш": "sh",
-        "щ": "sc",
-        "ъ": "",
-        "ы": "y",
-        "ь": "",
-        "э": "e",
-        "ю": "iu",
-        "я": "ia",
-    }
-
-    MAIN_TRANSLIT_TABLE = convert_table(add_uppercase(_MAIN_TRANSLIT_TABLE))
+    _MAIN_TRANSLIT_TABLE = override_table(
+        RussianGOST2006._MAIN_TRANSLIT_TABLE,
+        {
+            "ж": "j",
+            "х": "h",
+            "ц": "c",
+            "щ": "sc",
+        },
+    )
 
 
 class RussianISO9SystemA(object):
@@ -970,7 +1008,7 @@ class RussianISO9SystemA(object):
         "я": "â",
     }
 
-    MAIN_TRANSLIT_TABLE = convert_table(add_uppercase(_MAIN_TRANSLIT_TABLE))
+    MAIN_TRANSLIT_TABLE = lazy_attribute(build_main_translit_table)
 
 
 class RussianISO9SystemB(object):
@@ -1028,10 +1066,10 @@ class RussianISO9SystemB(object):
         "цй": "cj",
     }
 
-    SPECIAL_CASES = add_uppercase(_SPECIAL_CASES)
-    PATTERN1 = re.compile("(?mu)" + "|".join(SPECIAL_CASES.keys()))
+    SPECIAL_CASES = lazy_attribute(build_special_cases)
+    PATTERN1 = lazy_attribute(build_pattern1)
 
-    MAIN_TRANSLIT_TABLE = convert_table(add_uppercase(_MAIN_TRANSLIT_TABLE))
+    MAIN_TRANSLIT_TABLE = lazy_attribute(build_main_translit_table)
 
 
 class RussianInternationalPassport1997(object):
@@ -1076,70 +1114,30 @@ class RussianInternationalPassport1997(object):
         "я": "ya",
     }
 
-    MAIN_TRANSLIT_TABLE = convert_table(add_uppercase(_MAIN_TRANSLIT_TABLE))
+    MAIN_TRANSLIT_TABLE = lazy_attribute(build_main_translit_table)
 
     _SPECIAL_CASES = {
         "ье": "'ye",
         "ьё": "'ye",
     }
 
-    SPECIAL_CASES = add_uppercase(_SPECIAL_CASES)
-    PATTERN1 = re.compile("(?mu)" + "|".join(SPECIAL_CASES.keys()))
+    SPECIAL_CASES = lazy_attribute(build_special_cases)
+    PATTERN1 = lazy_attribute(build_pattern1)
 
 
-class RussianInternationalPassport1997Reduced(object):
+class RussianInternationalPassport1997Reduced(RussianInternationalPassport1997):
     """
     According to https://en.wikipedia.org/wiki/Romanization_of_Russian#Transliteration_of_the_names_in_Russian_passports
     (International Passport 1997, reduced variant for ий, ый)
     """
 
-    _MAIN_TRANSLIT_TABLE = {
-        "а": "a",
-        "б": "b",
-        "в": "v",
-        "г": "g",
-        "д": "d",
-        "е": "e",
-        "ё": "e",
-        "ж": "zh",
-        "з": "z",
-        "и": "i",
-        "й": "y",
-        "к": "k",
-        "л": "l",
-        "м": "m",
-        "н": "n",
-        "о": "o",
-        "п": "p",
-        "р": "r",
-        "с": "s",
-        "т": "t",
-        "у": "u",
-        "ф": "f",
-        "х": "kh",
-        "ц": "ts",
-        "ч": "ch",
-        "ш": "sh",
-        "щ": "shch",
-        "ъ": "'",
-        "ы": "y",
-        "ь": "",
-        "э": "e",
-        "ю": "yu",
-        "я": "ya",
-    }
-
-    MAIN_TRANSLIT_TABLE = convert_table(add_uppercase(_MAIN_TRANSLIT_TABLE))
-
-    _SPECIAL_CASES = {
-        "ье": "'ye",
-        "ьё": "'ye",
-        "ый": "y",
-        "ий": "y",
-    }
-
-    SPECIAL_CASES = add_uppercase(_SPECIAL_CASES)
-    PATTERN1 = re.compile("(?mu)" + "|".join(SPECIAL_CASES.keys()))
+    _SPECIAL_CASES = override_table(
+        RussianInternationalPassport1997._SPECIAL_CASES,
+        {
+            "ый": "y",
+            "ий": "y",
+        },
+    )
 
 
 class RussianDriverLicense(object):
@@ -1184,7 +1182,7 @@ class RussianDriverLicense(object):
         "я": "ya",
     }
 
-    MAIN_TRANSLIT_TABLE = convert_table(add_uppercase(_MAIN_TRANSLIT_TABLE))
+    MAIN_TRANSLIT_TABLE = lazy_attribute(build_main_translit_table)
 
     _SPECIAL_CASES = {
         # e, ye (В начале слов, а также после гласных и Ь, Ъ)
@@ -1210,11 +1208,11 @@ class RussianDriverLicense(object):
         "ё": "yo",
     }
 
-    SPECIAL_CASES = add_uppercase(_SPECIAL_CASES)
-    FIRST_CHARACTERS = add_uppercase(_FIRST_CHARACTERS)
+    SPECIAL_CASES = lazy_attribute(build_special_cases)
+    FIRST_CHARACTERS = lazy_attribute(build_first_characters)
 
-    PATTERN1 = re.compile("(?mu)" + "|".join(SPECIAL_CASES.keys()))
-    PATTERN2 = re.compile("(?mu)" + r"\b(" + "|".join(FIRST_CHARACTERS.keys()) + ")")
+    PATTERN1 = lazy_attribute(build_pattern1)
+    PATTERN2 = lazy_attribute(build_pattern2)
 
 
 ALL_UKRAINIAN = [
@@ -1252,7 +1250,725 @@ RussianInternationalPassport = RussianInternationalPassport1997
 ALL_TRANSLITERATIONS = ALL_UKRAINIAN + ALL_RUSSIAN
 
 
-def translit(src, table=UkrainianKMU, preserve_case=True):
+def _char_class(chars):
+    """
+    Compiles a regex matching any of the given characters
+
+    >>> print(_char_class(["]", "а", "-"]).pattern)
+    [\\-\\]а]
+    >>> print(_char_class([]).search(u"abc"))
+    None
+    """
+    if not chars:
+        return re.compile("(?!)")
+
+    # Only these are (or may become) special in a class, re.escape would
+    # escape every non-ASCII letter on Python 2
+    return re.compile(
+        "[%s]" % "".join("\\" + c if c in "\\[]^-" else c for c in sorted(chars))
+    )
+
+
+def _single_pass_pattern(special_cases, first_characters):
+    """
+    Builds one regex that does the job of both PATTERN1 and PATTERN2.
+
+    The pattern starts with a character set so the regex engine can skip
+    to candidate positions quickly, then checks each special case (in the
+    original order) and finally the word start condition for the first
+    characters. Returns None when the table can't be merged without
+    changing the results of the sequential passes.
+
+    >>> p = _single_pass_pattern({"зг": "zgh"}, {"є": "ye"})
+    >>> print(", ".join(m.group() for m in p.finditer(u"зге є зєє")))
+    зг, є
+    >>> print(_single_pass_pattern({"ье": "'"}, {"е": "ye"}))
+    None
+    """
+    for key in first_characters:
+        if len(key) != 1 or not _WORD_CHAR.match(key):
+            return None
+
+    if special_cases and first_characters:
+        for key, value in special_cases.items():
+            # PATTERN2 runs over the output of PATTERN1, so the result of a
+            # special case must keep the word boundary and must not contain
+            # anything PATTERN2 would pick up again
+            if not value or bool(_WORD_CHAR.match(key[-1])) != bool(
+                _WORD_CHAR.match(value[-1])
+            ):
+                return None
+            if set(value) & set(first_characters):
+                return None
+
+    leading = set(k[0] for k in special_cases if k) | set(first_characters)
+    if not leading or not all(special_cases):
+        return None
+
+    alternatives = [
+        "(?<=%s)%s" % (re.escape(k[0]), re.escape(k[1:])) for k in special_cases
+    ]
+    if first_characters:
+        alternatives.append(
+            r"(?<=[%s])(?<!\w.)" % "".join(re.escape(c) for c in first_characters)
+        )
+
+    return re.compile(
+        "(?mu)[%s](?:%s)"
+        % ("".join(re.escape(c) for c in sorted(leading)), "|".join(alternatives))
+    )
+
+
+# Apostrophe lookalikes that no table knows, folded into "'"
+_APOSTROPHE_LOOKALIKES = "\u2018`\u00b4\u2032\uff07\u02bb\u02b9"
+_CYRILLIC = "[\u0400-\u04ff]"
+
+# What the normalization stage replaces: decomposed letters (NFD),
+# Latin i next to a Cyrillic letter and apostrophe lookalikes between two
+# Cyrillic letters
+_NORMALIZATIONS = {
+    "и\u0306": "й",
+    "И\u0306": "Й",
+    "е\u0308": "ё",
+    "Е\u0308": "Ё",
+    "і\u0308": "ї",
+    "І\u0308": "Ї",
+    "i": "і",
+    "I": "І",
+    "i\u0308": "ї",
+    "I\u0308": "Ї",
+}
+_NORMALIZATIONS.update((c, "'") for c in _APOSTROPHE_LOOKALIKES)
+
+_NORMALIZE_PATTERN = re.compile(
+    "(?u)[иИ]\u0306|[еЕіІ]\u0308"
+    "|(?<=%(cyr)s)[iI]\u0308?|[iI]\u0308?(?=%(cyr)s)"
+    "|(?<=%(cyr)s)[%(apostrophes)s](?=%(cyr)s)"
+    % {"cyr": _CYRILLIC, "apostrophes": _APOSTROPHE_LOOKALIKES}
+)
+# Characters every normalization starts with or contains
+_NORMALIZE_TRIGGERS = set("\u0306\u0308iI" + _APOSTROPHE_LOOKALIKES)
+
+
+def _normalize(match):
+    return _NORMALIZATIONS[match.group()]
+
+
+def _make_translate_table(table):
+    # Identity entries for ASCII save str.translate a failed lookup (and an
+    # exception) for every space, digit and punctuation mark
+    translate_table = dict((i, text_type(chr(i))) for i in range(128))
+    translate_table.update(table.MAIN_TRANSLIT_TABLE)
+
+    return translate_table
+
+
+_build_translate_table = shared_builder("MAIN_TRANSLIT_TABLE")(_make_translate_table)
+
+
+class CompiledTable(object):
+    """
+    Transliteration table compiled into a single pass engine: deletions,
+    one combined substitution for special cases and first characters and
+    the main translation table. Produces exactly the same output as
+    applying DELETE_PATTERN, PATTERN1 and PATTERN2 one after another.
+
+    Strings without a character the table changes are returned as they
+    are, and the regex passes are skipped for strings without a character
+    any of them could start with.
+
+    >>> print(CompiledTable(UkrainianKMU)(u"Згуровський з'їзд"))
+    Zghurovskyi zizd
+    >>> print(CompiledTable(RussianSimple)(u"ЁЖ"))
+    EZH
+    >>> src = u"Order #42"
+    >>> CompiledTable(UkrainianKMU)(src) is src
+    True
+
+    With `normalize`, text is first brought to the form tables expect:
+    letters decomposed into a base letter and a combining breve or
+    diaeresis (NFD), Latin i next to Cyrillic letters and apostrophe
+    lookalikes (‘, `, ´, ′, ʻ, ʹ) between Cyrillic letters. Like the other
+    passes it is skipped when the text has none of the characters
+    involved. Every function that takes a table also accepts such a
+    compiled table, see get_compiled.
+
+    >>> print(CompiledTable(UkrainianKMU, normalize=True)(u"Чi и\u0306ого з‘їзд"))
+    Chi yoho zizd
+    """
+
+    def __init__(self, table, normalize=False):
+        self.table = table
+        self.name = getattr(table, "__name__", type(table).__name__)
+        self.normalize = normalize
+
+        special_cases = getattr(table, "SPECIAL_CASES", {})
+        first_characters = getattr(table, "FIRST_CHARACTERS", {})
+
+        # (sub, repl) pairs applied in order and the stage name of each
+        self.passes = []
+        self.stages = []
+        # Tables with equal keys run exactly the same passes
+        passes_key = []
+        if normalize:
+            self.passes.append((_NORMALIZE_PATTERN.sub, _normalize))
+            self.stages.append("normalize")
+            passes_key.append(_NORMALIZE_PATTERN.pattern)
+        if hasattr(table, "DELETE_PATTERN"):
+            self.passes.append((table.DELETE_PATTERN.sub, ""))
+            self.stages.append("delete")
+            passes_key.append(table.DELETE_PATTERN.pattern)
+
+        pattern = _single_pass_pattern(special_cases, first_characters)
+        if pattern is not None:
+            replacements = dict(first_characters)
+            replacements.update(special_cases)
+            self.passes.append((pattern.sub, lambda x: replacements[x.group()]))
+            self.stages.append("special_cases+first_characters")
+            passes_key.append((pattern.pattern, sorted(replacements.items())))
+        else:
+            if hasattr(table, "PATTERN1"):
+                self.passes.append(
+                    (table.PATTERN1.sub, lambda x: special_cases[x.group()])
+                )
+                self.stages.append("special_cases")
+                passes_key.append(
+                    (table.PATTERN1.pattern, sorted(special_cases.items()))
+                )
+            if hasattr(table, "PATTERN2"):
+                self.passes.append(
+                    (table.PATTERN2.sub, lambda x: first_characters[x.group()])
+                )
+                self.stages.append("first_characters")
+                passes_key.append(
+                    (table.PATTERN2.pattern, sorted(first_characters.items()))
+                )
+
+        self.passes_key = repr(passes_key)
+
+        if hasattr(table, "_DEFINITION"):
+            # Tables made by compile_table are never shared with another
+            # table, and keeping them in the shared cache would keep every
+            # one of them alive
+            self.translate_table = _make_translate_table(table)
+        else:
+            self.translate_table = _build_translate_table(table)
+
+        # Matches any character that the table may change. Strings without
+        # such characters come out of translit exactly as they went in. A
+        # special case or a deletion can only start with its first letter,
+        # so `triggers` tells whether the regex passes have anything to do
+        if hasattr(table, "DELETE_PATTERN") and not hasattr(table, "_DELETE_CASES"):
+            self.changes = self.triggers = None
+        else:
+            triggers = set()
+            for keys in (
+                special_cases,
+                first_characters,
+                getattr(table, "_DELETE_CASES", []),
+            ):
+                triggers.update(k[0] for k in keys if k)
+            if normalize:
+                triggers.update(_NORMALIZE_TRIGGERS)
+            changed = triggers | set(unichr(code) for code in table.MAIN_TRANSLIT_TABLE)
+
+            self.changes = _char_class(changed)
+            self.triggers = _char_class(triggers) if triggers else None
+
+        # Text streams are only split right after whitespace that no pass
+        # looks at, so no special case or word start spans two pieces
+        self.stream_separators = [
+            c
+            for c in "\n\r\t "
+            if not any(c in k for k in list(special_cases) + list(first_characters))
+            and not (
+                hasattr(table, "DELETE_PATTERN") and table.DELETE_PATTERN.search(c)
+            )
+        ]
+
+        # Overlong pieces without such whitespace may also be split after
+        # a non-word character that no pass looks at, which keeps the word
+        # start rule intact as well
+        excluded = set("".join(list(special_cases) + list(first_characters)))
+        if hasattr(table, "DELETE_PATTERN"):
+            excluded.update(table.DELETE_PATTERN.pattern)
+            excluded.update(
+                unichr(code)
+                for code in range(256)
+                if table.DELETE_PATTERN.search(unichr(code))
+            )
+        if normalize:
+            excluded.update(_NORMALIZE_TRIGGERS)
+        self.stream_breaks = re.compile(
+            r"(?su).*[^\w%s]" % "".join(re.escape(c) for c in sorted(excluded))
+        )
+
+        # Batches are joined with a separator that no pass can touch. Being
+        # a non-word character it also keeps the word start rule intact
+        self.batch_safe = not (
+            ord(_BATCH_SEPARATOR) in table.MAIN_TRANSLIT_TABLE
+            or any(
+                _BATCH_SEPARATOR in k
+                for k in list(special_cases) + list(first_characters)
+            )
+            or (
+                hasattr(table, "DELETE_PATTERN")
+                and table.DELETE_PATTERN.search(_BATCH_SEPARATOR)
+            )
+        )
+
+    def __reduce__(self):
+        # Tables made by compile_table are compiled again from their
+        # definition (once per process), the rest are pickled by reference
+        definition = getattr(self.table, "_DEFINITION", None)
+        if definition is not None:
+            return _compile_definition, (definition, self.normalize)
+
+        return get_compiled, (self.table, self.normalize)
+
+    def __call__(self, src, preserve_case=True):
+        if _instrumentation is not None:
+            return _instrumentation.run(self, src, preserve_case)
+
+        src = text_type(src)
+        if self.changes is not None and not self.changes.search(src):
+            return src
+
+        src_is_upper = src.isupper()
+
+        if self.triggers is None or self.triggers.search(src):
+            for sub, repl in self.passes:
+                src = sub(repl, src)
+        res = src.translate(self.translate_table)
+
+        if src_is_upper and preserve_case:
+            return res.upper()
+        else:
+            return res
+
+    def translit_batch(self, items, preserve_case=True):
+        """
+        Transliterates a list of strings at once by joining them, running
+        every pass over the joined text and splitting the result back
+
+        >>> compiled = CompiledTable(UkrainianKMU)
+        >>> print(", ".join(compiled.translit_batch([u"Юрій", u"ЗГУРОВСЬКИЙ", u"п'єса"])))
+        Yurii, ZGHUROVSKYI, piesa
+        """
+        if not items:
+            return []
+
+        joined = _BATCH_SEPARATOR.join(items)
+        if (
+            _instrumentation is not None
+            or not self.batch_safe
+            or joined.count(_BATCH_SEPARATOR) != len(items) - 1
+        ):
+            return [self(src, preserve_case) for src in items]
+
+        if self.changes is not None and not self.changes.search(joined):
+            return list(items)
+
+        if self.triggers is None or self.triggers.search(joined):
+            for sub, repl in self.passes:
+                joined = sub(repl, joined)
+        results = joined.translate(self.translate_table).split(_BATCH_SEPARATOR)
+
+        if preserve_case:
+            for i, src in enumerate(items):
+                if src.isupper():
+                    results[i] = results[i].upper()
+
+        return results
+
+
+class Instrumentation(object):
+    """
+    Collects per table statistics of transliteration: number of calls and
+    characters, time spent in every stage and number of matches of every
+    special case, first character and deleted character, as well as how
+    many calls took each of the fast paths ("unchanged" when the table has
+    nothing to change, "translate_only" when no regex pass could match,
+    "full" otherwise). `callback`, if
+    given, is called after every transliteration with the table name and
+    a dict of that call's figures.
+
+    Enable it with enable_instrumentation; when disabled, the only cost
+    is one check of a global variable per call.
+
+    >>> instrumentation = enable_instrumentation()
+    >>> print(translit(u"Згода з'їзду"))
+    Zghoda zizdu
+    >>> stats = instrumentation.snapshot()["UkrainianKMU"]
+    >>> print("%d %d" % (stats["calls"], stats["chars"]))
+    1 12
+    >>> for match, count in sorted(stats["matches"].items()):
+    ...     print("%s %d" % (match, count))
+    ' 1
+    Зг 1
+    >>> print(", ".join(sorted(stats["time"])))
+    delete, special_cases+first_characters, translate, upper
+    >>> print("%s %s" % (translit(u"ID-42"), translit(u"Харків")))
+    ID-42 Kharkiv
+    >>> for path, count in sorted(instrumentation.snapshot()["UkrainianKMU"]["paths"].items()):
+    ...     print("%s %d" % (path, count))
+    full 1
+    translate_only 1
+    unchanged 1
+    >>> disable_instrumentation()
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def reset(self):
+        """Drops all collected statistics"""
+        with self._lock:
+            self._stats = {}
+
+    def snapshot(self):
+        """Returns a copy of the statistics, keyed by table name"""
+        with self._lock:
+            return dict(
+                (
+                    name,
+                    {
+                        "calls": stats["calls"],
+                        "chars": stats["chars"],
+                        "time": dict(stats["time"]),
+                        "matches": dict(stats["matches"]),
+                        "paths": dict(stats["paths"]),
+                    },
+                )
+                for name, stats in self._stats.items()
+            )
+
+    def run(self, compiled, src, preserve_case):
+        """Does the same as CompiledTable.__call__, measuring every stage"""
+        timings = OrderedDict()
+        matches = {}
+
+        def counted(repl):
+            def count(match):
+                key = match.group()
+                matches[key] = matches.get(key, 0) + 1
+                return repl(match) if callable(repl) else repl
+
+            return count
+
+        src = text_type(src)
+        src_is_upper = src.isupper()
+        chars = len(src)
+
+        if compiled.changes is not None and not compiled.changes.search(src):
+            path = "unchanged"
+            res = src
+        else:
+            path = "full"
+            if compiled.triggers is None or compiled.triggers.search(src):
+                for stage, (sub, repl) in zip(compiled.stages, compiled.passes):
+                    started = _timer()
+                    src = sub(counted(repl), src)
+                    timings[stage] = _timer() - started
+            else:
+                path = "translate_only"
+
+            started = _timer()
+            res = src.translate(compiled.translate_table)
+            timings["translate"] = _timer() - started
+
+            started = _timer()
+            if src_is_upper and preserve_case:
+                res = res.upper()
+            timings["upper"] = _timer() - started
+
+        with self._lock:
+            stats = self._stats.setdefault(
+                compiled.name,
+                {"calls": 0, "chars": 0, "time": {}, "matches": {}, "paths": {}},
+            )
+            stats["calls"] += 1
+            stats["paths"][path] = stats["paths"].get(path, 0) + 1
+            stats["chars"] += chars
+            for stage, spent in timings.items():
+                stats["time"][stage] = stats["time"].get(stage, 0.0) + spent
+            for key, count in matches.items():
+                stats["matches"][key] = stats["matches"].get(key, 0) + count
+
+        if self.callback is not None:
+            self.callback(
+                compiled.name,
+                {"chars": chars, "time": timings, "matches": matches, "path": path},
+            )
+
+        return res
+
+
+_instrumentation = None
+
+
+def enable_instrumentation(callback=None):
+    """
+    Starts collecting statistics for every transliteration and returns
+    the Instrumentation object holding them
+    """
+    global _instrumentation
+
+    _instrumentation = Instrumentation(callback)
+    return _instrumentation
+
+
+def disable_instrumentation():
+    """Stops collecting statistics"""
+    global _instrumentation
+
+    _instrumentation = None
+
+
+_COMPILED_TABLES = {}
+
+
+def get_compiled(table, normalize=False):
+    """
+    Returns the CompiledTable for a given table, compiling it on first use.
+    With `normalize`, returns the one that normalizes text first, see
+    CompiledTable
+
+    >>> get_compiled(UkrainianKMU) is get_compiled(UkrainianKMU)
+    True
+    >>> print(", ".join(translit_many([u"Киі\u0308в"], get_compiled(UkrainianKMU, True))))
+    Kyiv
+    """
+    if isinstance(table, CompiledTable):
+        if table.normalize or not normalize:
+            return table
+        if not hasattr(table.table, "_DEFINITION"):
+            return get_compiled(table.table, normalize)
+
+        # Kept by the compiled table rather than in _COMPILED_TABLES, so
+        # tables made by compile_table can still be garbage collected
+        normalized = table.__dict__.get("_normalized")
+        if normalized is None:
+            normalized = table._normalized = CompiledTable(table.table, normalize)
+        return normalized
+
+    key = (table, True) if normalize else table
+    try:
+        return _COMPILED_TABLES[key]
+    except KeyError:
+        compiled = _COMPILED_TABLES[key] = CompiledTable(table, normalize)
+        return compiled
+
+
+def warm_up(tables=ALL_TRANSLITERATIONS):
+    """
+    Compiles given tables ahead of time. Call it in the parent process
+    before forking workers, so they inherit ready tables instead of each
+    building its own copy on first use.
+
+    >>> print(len(warm_up([UkrainianKMU, RussianICAO])))
+    2
+    """
+    return [get_compiled(table) for table in tables]
+
+
+def _ordered_keys(table, order, what):
+    """
+    Returns the keys of the table in the order regex alternatives should
+    be tried, checking that every key can match
+    """
+    if order == "longest":
+        # Longer keys first, so no key is hidden by its own prefix
+        return sorted(table, key=lambda k: (-len(k), k))
+
+    keys = list(table)
+    for i, key in enumerate(keys):
+        for earlier in keys[:i]:
+            if key.startswith(earlier):
+                raise ValueError(
+                    "%s %r never matches, %r comes before it" % (what, key, earlier)
+                )
+
+    return keys
+
+
+def _with_uppercase(table, what):
+    for k, v in table.items():
+        if not k:
+            raise ValueError("Empty %s" % what.lower())
+        upper = k.capitalize()
+        if upper != k and upper in table and table[upper] != v.capitalize():
+            raise ValueError(
+                "%s %r conflicts with %r: %r is not %r"
+                % (what, upper, k, table[upper], v.capitalize())
+            )
+
+    return add_uppercase(table)
+
+
+def compile_table(
+    main,
+    special_cases=None,
+    first_characters=None,
+    delete=None,
+    name="CustomTable",
+    order="longest",
+    normalize=False,
+):
+    """Builds a transliteration table out of plain dicts, the same way the
+    built-in tables are defined, and compiles it. Keys are lowercase,
+    uppercase variants are added automatically. The result can be passed
+    as the table to translit and every other function of this module, and
+    can be pickled (e.g. for translit_parallel).
+
+    :param main: {cyrillic letter: latin}
+    :param special_cases: {cyrillic sequence: latin}, replaced before the
+        main table
+    :param first_characters: {cyrillic letter: latin}, replaced at the
+        start of words instead of using the main table
+    :param delete: sequences removed before anything else, as given
+    :param name: name of the table, e.g. for translit_all
+    :param order: "longest" to try longer special cases (and first
+        characters) first, or "given" to try them in the order of the
+        dict, which then must not hide a key behind its own prefix
+    :param normalize: normalize text first, see CompiledTable
+    :returns: CompiledTable
+    :raises ValueError: when the table is inconsistent: keys of `main`
+        that aren't single characters, lowercase and uppercase keys with
+        different values, keys that could never match
+
+    >>> table = compile_table(
+    ...     UkrainianKMU._MAIN_TRANSLIT_TABLE,
+    ...     special_cases=override_table(UkrainianKMU._SPECIAL_CASES, {u"ґ": u"gh"}),
+    ...     first_characters=UkrainianKMU._FIRST_CHARACTERS,
+    ...     delete=UkrainianKMU._DELETE_CASES + [u"`"],
+    ...     name="OurKMU",
+    ... )
+    >>> print(translit(u"Ґалаґан з`їв ЗГУРОВСЬКИЙ", table))
+    Ghalaghan ziv ZGhUROVSKYI
+    >>> compile_table({u"ab": u"x"})  # doctest: +IGNORE_EXCEPTION_DETAIL
+    Traceback (most recent call last):
+    ...
+    ValueError: Key of the main table must be a single character: 'ab'
+    >>> compile_table({u"а": u"a", u"А": u"X"})  # doctest: +IGNORE_EXCEPTION_DETAIL
+    Traceback (most recent call last):
+    ...
+    ValueError: Letter 'А' conflicts with 'а': 'X' is not 'A'
+    >>> special_cases = OrderedDict([(u"ь", u""), (u"ье", u"ye")])
+    >>> compile_table({}, special_cases, order="given")  # doctest: +IGNORE_EXCEPTION_DETAIL
+    Traceback (most recent call last):
+    ...
+    ValueError: Special case 'ье' never matches, 'ь' comes before it
+    """
+    # Copies, so changes to the caller's dicts don't reach the table or
+    # its pickled definition
+    main = dict(main)
+    special_cases = OrderedDict(special_cases or {})
+    first_characters = OrderedDict(first_characters or {})
+    delete = list(delete or [])
+    if order not in ("longest", "given"):
+        raise ValueError("Unknown order: %r" % (order,))
+
+    for key in main:
+        if len(key) != 1:
+            raise ValueError(
+                "Key of the main table must be a single character: %r" % (key,)
+            )
+    for key in delete:
+        if not key:
+            raise ValueError("Empty deleted sequence")
+        for special in special_cases:
+            if key in special or key in special.capitalize():
+                raise ValueError(
+                    "Special case %r never matches, %r is deleted first"
+                    % (special, key)
+                )
+    for key in first_characters:
+        if key in special_cases:
+            raise ValueError("%r is both a special case and a first character" % (key,))
+
+    attrs = {
+        "_DEFINITION": (main, special_cases, first_characters, delete, name, order),
+        "_MAIN_TRANSLIT_TABLE": main,
+        "MAIN_TRANSLIT_TABLE": convert_table(_with_uppercase(main, "Letter")),
+    }
+
+    if delete:
+        attrs["_DELETE_CASES"] = delete
+        attrs["DELETE_PATTERN"] = re.compile(
+            "(?mu)"
+            + "|".join(
+                re.escape(k) for k in _ordered_keys(delete, order, "Deleted sequence")
+            )
+        )
+
+    if special_cases:
+        table = _with_uppercase(special_cases, "Special case")
+        keys = _ordered_keys(table, order, "Special case")
+        attrs["_SPECIAL_CASES"] = special_cases
+        attrs["SPECIAL_CASES"] = OrderedDict((k, table[k]) for k in keys)
+        attrs["PATTERN1"] = re.compile("(?mu)" + "|".join(re.escape(k) for k in keys))
+
+    if first_characters:
+        table = _with_uppercase(first_characters, "First character")
+        keys = _ordered_keys(table, order, "First character")
+        attrs["_FIRST_CHARACTERS"] = first_characters
+        attrs["FIRST_CHARACTERS"] = OrderedDict((k, table[k]) for k in keys)
+        attrs["PATTERN2"] = re.compile(
+            "(?mu)" + r"\b(" + "|".join(re.escape(k) for k in keys) + ")"
+        )
+
+    return CompiledTable(type(str(name), (object,), attrs), normalize)
+
+
+# (definition, normalize) -> CompiledTable, for unpickled tables
+_DEFINED_TABLES = {}
+
+
+def _compile_definition(definition, normalize):
+    """
+    Unpickles a table made by compile_table. Every definition is compiled
+    only once per process, however many times it is unpickled
+
+    >>> table = compile_table({u"а": u"a"})
+    >>> import pickle
+    >>> pickle.loads(pickle.dumps(table)) is pickle.loads(pickle.dumps(table))
+    True
+
+    Changes to the dicts the table was made of don't reach it:
+
+    >>> letters = {u"а": u"a"}
+    >>> table = compile_table(letters)
+    >>> letters[u"б"] = u"b"
+    >>> print(translit(u"аб", pickle.loads(pickle.dumps(table))))
+    aб
+    """
+    main, special_cases, first_characters, delete, name, order = definition
+    key = (
+        tuple(sorted(main.items())),
+        tuple(special_cases.items()),
+        tuple(first_characters.items()),
+        tuple(delete),
+        name,
+        order,
+        normalize,
+    )
+
+    try:
+        return _DEFINED_TABLES[key]
+    except TypeError:
+        # Values that can't be hashed, the table is compiled every time
+        return compile_table(*definition, normalize=normalize)
+    except KeyError:
+        compiled = _DEFINED_TABLES[key] = compile_table(
+            *definition, normalize=normalize
+        )
+        return compiled
+
+
+def translit(src, table=UkrainianKMU, preserve_case=True, normalize=False):
     """Transliterates given unicode `src` text
     to transliterated variant according to a given transliteration table.
     Official ukrainian transliteration is used by default
@@ -1264,6 +1980,9 @@ def translit(src, table=UkrainianKMU, preserve_case=True):
     :param preserve_case: convert result to uppercase if source is uppercased
     (see the example below for the difference that flag makes)
     :type preserve_case: bool
+    :param normalize: fold decomposed letters, Latin i in Cyrillic words and
+    apostrophe lookalikes first (see CompiledTable)
+    :type normalize: bool
     :returns: transliterated string
     :rtype: str
 
@@ -1361,32 +2080,898 @@ def translit(src, table=UkrainianKMU, preserve_case=True):
     Cyomki
     >>> print(translit(u"Цыц", RussianISO9SystemB))
     Cy'cz
+    >>> print(translit(u"Киі\u0308в", normalize=True))
+    Kyiv
+    """
+
+    return get_compiled(table, normalize)(src, preserve_case)
+
+
+def translit_many(iterable, table=UkrainianKMU, preserve_case=True, batch_size=1000):
+    """Transliterates every string from `iterable` with the same table.
+    Strings are processed in batches, which is much cheaper than calling
+    translit for each of them.
+
+    :param iterable: strings to transliterate
+    :param table: transliteration table
+    :type table: transliteration table object
+    :param preserve_case: same as for translit
+    :type preserve_case: bool
+    :param batch_size: number of strings to transliterate at once
+    :type batch_size: int
+    :returns: generator of transliterated strings in the order of `iterable`
+
+    >>> print(", ".join(translit_many([u"Євген", u"Київ", u"", u"ЩУКА"])))
+    Yevhen, Kyiv, , SHCHUKA
+    >>> print(", ".join(translit_many([u"Ель", u"Подъезд"], RussianDriverLicense)))
+    Yel', Pod'yezd
     """
+    compiled = get_compiled(table)
+    batch = []
 
+    for src in iterable:
+        batch.append(text_type(src))
+        if len(batch) >= batch_size:
+            for res in compiled.translit_batch(batch, preserve_case):
+                yield res
+            batch = []
+
+    for res in compiled.translit_batch(batch, preserve_case):
+        yield res
+
+
+_NOT_ONE_CHARACTER = re.compile("[^\x01]")
+
+
+def translit_with_offsets(src, table=UkrainianKMU, preserve_case=True):
+    """Transliterates `src` like translit and tells where every character
+    of the result comes from. Letters produced by a special case or a
+    first character point at the start of the sequence they replace,
+    deleted characters are pointed at by nothing.
+
+    :param src: string to transliterate
+    :type src: str
+    :param table: transliteration table
+    :param preserve_case: same as for translit
+    :type preserve_case: bool
+    :returns: (transliterated string, offsets) where offsets is an
+        array('I') one longer than the result: offsets[i] is the index in
+        `src` of the character result[i] was made from, and the last item
+        is len(src), so result[i:j] comes from src[offsets[i]:offsets[j]]
+
+    >>> res, offsets = translit_with_offsets(u"Щука з'їла")
+    >>> print(res)
+    Shchuka zila
+    >>> print(" ".join("%d" % i for i in offsets))
+    0 0 0 0 1 2 3 4 5 7 8 9 10
+    >>> start = res.index(u"zila")
+    >>> print(u"Щука з'їла"[offsets[start] : offsets[start + 4]])
+    з'їла
+    """
+    compiled = get_compiled(table)
+    src = text_type(src)
+
+    if compiled.changes is not None and not compiled.changes.search(src):
+        return src, array("I", range(len(src) + 1))
+
+    text = src
+    offsets = array("I", range(len(src)))
+
+    if compiled.triggers is None or compiled.triggers.search(src):
+        for sub, repl in compiled.passes:
+            pieces = []
+            new_offsets = array("I")
+            last = 0
+            for match in sub.__self__.finditer(text):
+                start, end = match.span()
+                replacement = repl(match) if callable(repl) else repl
+                pieces.append(text[last:start])
+                new_offsets.extend(offsets[last:start])
+                pieces.append(replacement)
+                new_offsets.extend(offsets[start : start + 1] * len(replacement))
+                last = end
+            pieces.append(text[last:])
+            new_offsets.extend(offsets[last:])
+            text = "".join(pieces)
+            offsets = new_offsets
+
+    # Every character turns into as many characters of the result as its
+    # replacement has, so its offset is repeated that many times. Only the
+    # characters that don't turn into exactly one need to be looked at
+    get = compiled.translate_table.get
+    lengths = dict((ord(c), unichr(len(get(ord(c), c)))) for c in set(text))
+    new_offsets = array("I")
+    last = 0
+    for match in _NOT_ONE_CHARACTER.finditer(text.translate(lengths)):
+        i = match.start()
+        new_offsets.extend(offsets[last:i])
+        new_offsets.extend(offsets[i : i + 1] * ord(match.group()))
+        last = i + 1
+    new_offsets.extend(offsets[last:])
+    new_offsets.append(len(src))
+    offsets = new_offsets
+    res = text.translate(compiled.translate_table)
+
+    if preserve_case and src.isupper():
+        upper = res.upper()
+        if len(upper) != len(res):
+            # A few letters (e.g. ß) turn into more than one when uppercased
+            offsets = array(
+                "I",
+                chain.from_iterable(
+                    repeat(origin, len(c.upper())) for c, origin in zip(res, offsets)
+                ),
+            )
+            offsets.append(len(src))
+        res = upper
+
+    return res, offsets
+
+
+def translit_tokens(
+    tokens, table=UkrainianKMU, word_initial_flags=None, preserve_case=True
+):
+    """Transliterates a list of tokens, e.g. from a tokenizer, and returns
+    a list of results aligned to it. A token either starts a word or
+    continues the token before it (say, "з", "'", "їзд"), as given by
+    `word_initial_flags`; every token starts a word by default.
+
+    The results are exactly what translit gives for the text where each
+    word is separated from the next by a character no table touches, and
+    the tokens of a word are joined as they are: special cases, deletions
+    and the word start rule work across tokens of a word, and the case
+    rule applies to the text as a whole. An output sequence made from
+    letters of several tokens goes to the token where it starts.
+
+    :param tokens: strings to transliterate
+    :param table: transliteration table
+    :param word_initial_flags: one bool per token, False for tokens that
+        continue the previous one
+    :param preserve_case: same as for translit
+    :type preserve_case: bool
+    :returns: list of transliterated tokens
+
+    >>> print(", ".join(translit_tokens([u"Згуровський", u"з", u"'", u"їзд"],
+    ...                                 word_initial_flags=[True, True, False, False])))
+    Zghurovskyi, z, , izd
+    >>> print(", ".join(translit_tokens([u"ЮРІЙ", u"ЗГУРОВСЬКИЙ"])))
+    YURII, ZGHUROVSKYI
+    """
+    compiled = get_compiled(table)
+    tokens = [text_type(token) for token in tokens]
+    if word_initial_flags is None:
+        word_initial_flags = [True] * len(tokens)
+    elif len(word_initial_flags) != len(tokens):
+        raise ValueError(
+            "Got %d word initial flags for %d tokens"
+            % (len(word_initial_flags), len(tokens))
+        )
+
+    # (index of the first token, number of tokens) of every word
+    words = []
+    for i, word_initial in enumerate(word_initial_flags):
+        if word_initial or not words:
+            words.append([i, 1])
+        else:
+            words[-1][1] += 1
+
+    results = [None] * len(tokens)
+    single = [first for first, count in words if count == 1]
+    for i, res in zip(
+        single, compiled.translit_batch([tokens[i] for i in single], False)
+    ):
+        results[i] = res
+
+    for first, count in words:
+        if count == 1:
+            continue
+        word_tokens = tokens[first : first + count]
+        res, offsets = translit_with_offsets("".join(word_tokens), compiled, False)
+        start = 0
+        source_end = 0
+        for i, token in enumerate(word_tokens):
+            source_end += len(token)
+            end = bisect_left(offsets, source_end) if i < count - 1 else len(res)
+            results[first + i] = res[start:end]
+            start = end
+
+    if preserve_case and _BATCH_SEPARATOR.join(tokens).isupper():
+        results = [res.upper() for res in results]
+
+    return results
+
+
+def translit_all(src, tables=ALL_TRANSLITERATIONS, preserve_case=True):
+    """Transliterates `src` with every table from `tables` at once.
+    Case analysis is done once, and tables that share deletions, special
+    cases and first characters share the substitution passes as well.
+
+    :param src: string to transliterate
+    :type src: str
+    :param tables: transliteration tables
+    :param preserve_case: same as for translit
+    :type preserve_case: bool
+    :returns: transliterations keyed by the table name, in the order of `tables`
+    :rtype: OrderedDict
+
+    >>> res = translit_all(u"Згуровський", ALL_UKRAINIAN)
+    >>> print("%s %s" % (res["UkrainianKMU"], res["UkrainianSimple"]))
+    Zghurovskyi Zhurovs'kyj
+    >>> print(len(translit_all(u"Щука")))
+    23
+    """
+    src = text_type(src)
+    src_is_upper = preserve_case and src.isupper()
+    substituted = {}
+    results = OrderedDict()
+
+    for table in tables:
+        compiled = get_compiled(table)
+        if _instrumentation is not None:
+            results[compiled.name] = compiled(src, preserve_case)
+            continue
+
+        text = substituted.get(compiled.passes_key)
+        if text is None:
+            text = src
+            for sub, repl in compiled.passes:
+                text = sub(repl, text)
+            substituted[compiled.passes_key] = text
+
+        res = text.translate(compiled.translate_table)
+        results[compiled.name] = res.upper() if src_is_upper else res
+
+    return results
+
+
+def translit_variants(
+    src, tables=ALL_TRANSLITERATIONS, preserve_case=True, max_variants=None
+):
+    """Returns unique transliterations of `src` by the given tables along
+    with the names of the tables that produced each of them. Variants
+    produced by more tables come first.
+
+    :param src: string to transliterate
+    :type src: str
+    :param tables: transliteration tables
+    :param preserve_case: same as for translit
+    :type preserve_case: bool
+    :param max_variants: return at most this many variants
+    :type max_variants: int
+    :returns: list of (variant, list of table names) tuples
+
+    >>> for variant, names in translit_variants(u"Юрій", ALL_UKRAINIAN, max_variants=3):
+    ...     print("%s %d" % (variant, len(names)))
+    Jurij 5
+    Yurii 3
+    Yuriĭ 1
+    """
+    variants = OrderedDict()
+    for name, res in translit_all(src, tables, preserve_case).items():
+        variants.setdefault(res, []).append(name)
+
+    ranked = sorted(variants.items(), key=lambda item: -len(item[1]))
+    return ranked[:max_variants] if max_variants is not None else ranked
+
+
+# Letters that only one of the languages has
+UKRAINIAN_LETTERS = "іїєґІЇЄҐ"
+RUSSIAN_LETTERS = "ыэъёЫЭЪЁ"
+_LANGUAGE_LETTERS = re.compile("[%s%s]" % (UKRAINIAN_LETTERS, RUSSIAN_LETTERS))
+# Also finds the separators of a joined batch
+_BATCH_LANGUAGE_LETTERS = re.compile(
+    "[%s%s%s]" % (UKRAINIAN_LETTERS, RUSSIAN_LETTERS, _BATCH_SEPARATOR)
+)
+_WHITESPACE = re.compile(r"(?u)(\s+)")
+
+
+def _language(letters, default):
+    ukrainian = sum(1 for c in letters if c in UKRAINIAN_LETTERS)
+    if ukrainian * 2 > len(letters):
+        return "uk"
+    if ukrainian * 2 < len(letters):
+        return "ru"
+
+    return default
+
+
+def detect_language(src, default=None):
+    """Tells Ukrainian text from Russian by the letters only one of them
+    has (і, ї, є, ґ against ы, э, ъ, ё), in one scan of the text.
+
+    :param src: text to check
+    :param default: returned when the text has none of these letters, or
+        as many of one language as of the other
+    :returns: "uk", "ru" or `default`
+
+    >>> print("%s %s" % (detect_language(u"Київ"), detect_language(u"Подъезд")))
+    uk ru
+    >>> print("%s %s" % (detect_language(u"Одеса"), detect_language(u"Одеса", "uk")))
+    None uk
+    >>> print(detect_language(u"Київ\\x00\\x00"))
+    uk
+    """
+    return _language(_LANGUAGE_LETTERS.findall(text_type(src)), default)
+
+
+def translit_auto(
+    src,
+    ukrainian_table=UkrainianKMU,
+    russian_table=RussianICAO,
+    preserve_case=True,
+    per_word=False,
+    default="uk",
+):
+    """Transliterates `src` with `ukrainian_table` or `russian_table`,
+    whichever detect_language picks.
+
+    With `per_word`, every word is checked on its own, words without
+    telling letters go with the text as a whole, and each run of words in
+    one language is transliterated as a separate text.
+
+    :param src: text to transliterate
+    :param ukrainian_table: table for Ukrainian text
+    :param russian_table: table for Russian text
+    :param preserve_case: same as for translit
+    :type preserve_case: bool
+    :param per_word: detect the language of every word
+    :type per_word: bool
+    :param default: "uk" or "ru", for text without telling letters
+    :returns: transliterated text
+
+    >>> print(translit_auto(u"Юрій"))
+    Yurii
+    >>> print(translit_auto(u"Юрий Подъячев"))
+    Iurii Podieiachev
+    >>> print(translit_auto(u"Київ Москва Подъячев", per_word=True))
+    Kyiv Moskva Podieiachev
+    """
     src = text_type(src)
-    src_is_upper = src.isupper()
+    tables = {"uk": ukrainian_table, "ru": russian_table}
+    language = detect_language(src, default)
+    if not per_word:
+        return translit(src, tables[language], preserve_case)
+
+    # Words of the same language are kept together with the whitespace
+    # between them
+    runs = []
+    for i, part in enumerate(_WHITESPACE.split(src)):
+        if i % 2 == 0 and part:
+            part_language = detect_language(part, language)
+            if runs and runs[-1][0] != part_language:
+                runs.append([part_language, part])
+                continue
+            if not runs:
+                runs.append([part_language, ""])
+        elif not runs:
+            runs.append([language, ""])
+        runs[-1][1] += part
+
+    return "".join(
+        translit(text, tables[run_language], preserve_case)
+        for run_language, text in runs
+    )
+
+
+def translit_auto_many(
+    iterable,
+    ukrainian_table=UkrainianKMU,
+    russian_table=RussianICAO,
+    preserve_case=True,
+    default="uk",
+    batch_size=1000,
+):
+    """Does translit_auto for every string from `iterable`, a language per
+    string. Every batch is scanned for the telling letters at once, then
+    the Ukrainian and the Russian strings are transliterated as batches.
+
+    :param iterable: strings to transliterate
+    :param ukrainian_table: table for Ukrainian strings
+    :param russian_table: table for Russian strings
+    :param preserve_case: same as for translit
+    :type preserve_case: bool
+    :param default: "uk" or "ru", for strings without telling letters
+    :param batch_size: number of strings to transliterate at once
+    :type batch_size: int
+    :returns: generator of transliterated strings in the order of `iterable`
+
+    >>> print(", ".join(translit_auto_many([u"Київ", u"Подъезд", u"Одеса"])))
+    Kyiv, Podieezd, Odesa
+    """
+    tables = {"uk": get_compiled(ukrainian_table), "ru": get_compiled(russian_table)}
+    items = iter(iterable)
+
+    while True:
+        batch = [text_type(src) for src in islice(items, batch_size)]
+        if not batch:
+            return
+
+        letters = "".join(_BATCH_LANGUAGE_LETTERS.findall(_BATCH_SEPARATOR.join(batch)))
+        letters = letters.split(_BATCH_SEPARATOR)
+        if len(letters) != len(batch):
+            letters = [_LANGUAGE_LETTERS.findall(src) for src in batch]
+
+        todo = {"uk": [], "ru": []}
+        for i, string_letters in enumerate(letters):
+            todo[_language(string_letters, default)].append(i)
+
+        results = [None] * len(batch)
+        for language, indexes in todo.items():
+            for i, res in zip(
+                indexes,
+                tables[language].translit_batch(
+                    [batch[i] for i in indexes], preserve_case
+                ),
+            ):
+                results[i] = res
+
+        for res in results:
+            yield res
+
+
+def _split_stream(chunks, separators, limit=None, breaks=None):
+    """
+    Regroups text chunks into pieces that end right after one of the
+    separators, carrying the rest over to the next chunk. Once more than
+    `limit` characters are carried over, they are also split after the
+    last match of `breaks`, a regex matching a prefix of text.
+
+    >>> print("|".join(_split_stream([u"ab c", u"d", u"e f", u"g"], [" "])))
+    ab |cde |fg
+    >>> breaks = re.compile("(?s).*,")
+    >>> print("|".join(_split_stream([u"a,b", u",c", u"d,e"], [" "], 2, breaks)))
+    a,|b,|cd,|e
+    """
+    carry = []
+    size = 0
+    # Number of carried parts before the last break and its offset in
+    # the next part
+    split = None
+
+    for chunk in chunks:
+        chunk = text_type(chunk)
+        cut = max([chunk.rfind(sep) for sep in separators] + [-1]) + 1
+        if cut:
+            yield "".join(carry) + chunk[:cut]
+            carry, size, split = [], 0, None
+            chunk = chunk[cut:]
+
+        if breaks is not None:
+            match = breaks.match(chunk)
+            if match:
+                split = (len(carry), match.end())
+        carry.append(chunk)
+        size += len(chunk)
+
+        if limit is not None and size > limit and split is not None:
+            i, cut = split
+            yield "".join(carry[:i]) + carry[i][:cut]
+            # Nothing after the last break can be a break
+            carry = [carry[i][cut:]] + carry[i + 1 :]
+            size = sum(len(part) for part in carry)
+            split = None
+
+    carry = "".join(carry)
+    if carry:
+        yield carry
+
+
+def translit_chunks(
+    chunks, table=UkrainianKMU, preserve_case=True, chunk_size=65536, is_upper=None
+):
+    """Transliterates text that comes in chunks, e.g. read from a file.
+    Joined output is the same as of translit for the whole text.
+
+    Chunks are split again after whitespace, so special cases and word
+    starts never span two pieces. Text without such whitespace is split
+    after punctuation no pass looks at once more than `chunk_size`
+    characters are carried over, so only a run of over `chunk_size`
+    characters without either is kept in memory as a whole.
+
+    As translit uppercases the result when the whole text is uppercased,
+    output is held back while no lowercase letter has been seen yet, so
+    uppercased text is kept in memory until its end. Pass `is_upper`
+    when it is known in advance whether the whole text is uppercased
+    (translit_stream finds out for files it can seek in).
+
+    :param chunks: iterable of text chunks
+    :param table: transliteration table
+    :type table: transliteration table object
+    :param preserve_case: same as for translit
+    :type preserve_case: bool
+    :param chunk_size: number of characters carried over before the text
+        is split at punctuation
+    :type chunk_size: int
+    :param is_upper: whether the whole text is uppercased, None if unknown
+    :type is_upper: bool
+    :returns: generator of transliterated chunks
+
+    >>> print("".join(translit_chunks([u"Дмитро З", u"гуровський п", u"'єса"])))
+    Dmytro Zghurovskyi piesa
+    >>> print("".join(translit_chunks([u"ЩУКА ", u"ЩУКА"])))
+    SHCHUKA SHCHUKA
+    >>> print("".join(translit_chunks([u"ЩУКА ", u"щука"])))
+    ShchUKA shchuka
+    >>> print("".join(translit_chunks([u"ЩУКА,", u"ЩУКА"], chunk_size=2, is_upper=True)))
+    SHCHUKA,SHCHUKA
+    """
+    compiled = get_compiled(table)
+    undecided = preserve_case and is_upper is None
+    upper = preserve_case and bool(is_upper)
+    has_cased = False
+    pending = []
+
+    pieces = _split_stream(
+        chunks, compiled.stream_separators, chunk_size, compiled.stream_breaks
+    )
+    for piece in pieces:
+        res = compiled(piece, preserve_case=False)
+
+        if undecided:
+            # (piece + "A").isupper() is False only if the piece has a
+            # lowercase letter, which means the whole text isn't uppercased
+            if (piece + "A").isupper():
+                has_cased = has_cased or piece.isupper()
+                pending.append(res)
+                continue
+
+            undecided = False
+            for pending_res in pending:
+                yield pending_res
+            pending = []
+
+        yield res.upper() if upper else res
+
+    for pending_res in pending:
+        yield pending_res.upper() if has_cased else pending_res
+
+
+def _is_upper(fileobj, chunk_size):
+    """Reads `fileobj` to the end and tells whether all of it is
+    uppercased, the same way as str.isupper"""
+    has_cased = False
+    for chunk in iter(lambda: fileobj.read(chunk_size), ""):
+        if not (chunk + "A").isupper():
+            return False
+        has_cased = has_cased or chunk.isupper()
+
+    return has_cased
+
+
+def translit_stream(
+    fileobj_in, fileobj_out, table=UkrainianKMU, preserve_case=True, chunk_size=65536
+):
+    """Transliterates text file `fileobj_in` into `fileobj_out` reading
+    it by `chunk_size` characters. See translit_chunks for details.
+
+    If `fileobj_in` is seekable and `preserve_case` is set, it is first
+    read once to find out whether it is uppercased, so memory use stays
+    within a few chunks. Otherwise uppercased text is held in memory
+    until its end.
+
+    >>> import io
+    >>> out = io.StringIO()
+    >>> translit_stream(io.StringIO(u"Згода\\nЮрій"), out, chunk_size=3)
+    >>> print(out.getvalue())
+    Zghoda
+    Yurii
+    """
+    is_upper = None
+    seekable = getattr(fileobj_in, "seekable", None)
+    if preserve_case and seekable is not None and seekable():
+        start = fileobj_in.tell()
+        is_upper = _is_upper(fileobj_in, chunk_size)
+        fileobj_in.seek(start)
+
+    chunks = iter(lambda: fileobj_in.read(chunk_size), "")
+
+    for res in translit_chunks(chunks, table, preserve_case, chunk_size, is_upper):
+        fileobj_out.write(res)
 
-    if hasattr(table, "DELETE_PATTERN"):
-        src = table.DELETE_PATTERN.sub("", src)
 
-    if hasattr(table, "PATTERN1"):
-        src = table.PATTERN1.sub(lambda x: table.SPECIAL_CASES[x.group()], src)
+def get_table(name):
+    """
+    Returns transliteration table by its class name
+
+    >>> get_table("RussianICAO") is RussianICAO
+    True
+    """
+    for table in ALL_TRANSLITERATIONS:
+        if table.__name__ == name:
+            return table
+
+    raise KeyError("Unknown transliteration table: %s" % name)
 
-    if hasattr(table, "PATTERN2"):
-        src = table.PATTERN2.sub(lambda x: table.FIRST_CHARACTERS[x.group()], src)
-    res = src.translate(table.MAIN_TRANSLIT_TABLE)
 
-    if src_is_upper and preserve_case:
-        return res.upper()
-    else:
+_PARALLEL_TABLE = None
+
+
+def _init_parallel_worker(table):
+    global _PARALLEL_TABLE
+
+    if isinstance(table, (str, text_type)):
+        table = get_table(table)
+    _PARALLEL_TABLE = get_compiled(table)
+
+
+def _translit_parallel_chunk(args):
+    chunk, preserve_case = args
+    return _PARALLEL_TABLE.translit_batch(chunk, preserve_case)
+
+
+def translit_parallel(
+    iterable, table=UkrainianKMU, preserve_case=True, processes=None, chunksize=1000
+):
+    """Transliterates strings from `iterable` in a pool of worker processes.
+    Works like map(translit, iterable) but uses all CPU cores.
+
+    Workers receive the name of a built-in table and compile it once on
+    start. Strings are sent in chunks of `chunksize`, at most two chunks
+    per worker are in flight, and results come back lazily in the input
+    order. The pool is shut down once the generator is exhausted or closed.
+
+    :param iterable: strings to transliterate
+    :param table: transliteration table
+    :type table: transliteration table object
+    :param preserve_case: same as for translit
+    :type preserve_case: bool
+    :param processes: number of worker processes, CPU count by default
+    :type processes: int
+    :param chunksize: number of strings sent to a worker at once
+    :type chunksize: int
+    :returns: generator of transliterated strings
+    :raises ValueError: when `chunksize` is less than 1
+
+    >>> print(", ".join(translit_parallel([u"Київ", u"Львів"], processes=2, chunksize=1)))
+    Kyiv, Lviv
+    >>> next(translit_parallel([u"Київ"], chunksize=0))
+    Traceback (most recent call last):
+    ...
+    ValueError: chunksize must be at least 1, got 0
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1, got %r" % (chunksize,))
+
+    # Imported here so that plain translit doesn't pay for it
+    import multiprocessing
+    from collections import deque
+
+    try:
+        # Names are byte strings on Python 2, which the worker would take
+        # for a table object
+        table_arg = (
+            text_type(table.__name__) if get_table(table.__name__) is table else table
+        )
+    except (AttributeError, KeyError):
+        table_arg = table
+
+    processes = processes or multiprocessing.cpu_count()
+    pool = multiprocessing.Pool(processes, _init_parallel_worker, (table_arg,))
+    items = iter(iterable)
+
+    try:
+        pending = deque()
+        while True:
+            chunk = [text_type(src) for src in islice(items, chunksize)]
+            if chunk:
+                pending.append(
+                    pool.apply_async(
+                        _translit_parallel_chunk, ((chunk, preserve_case),)
+                    )
+                )
+            if pending and (not chunk or len(pending) >= processes * 2):
+                for res in pending.popleft().get():
+                    yield res
+            elif not chunk:
+                break
+
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+
+def translit_threaded(
+    iterable, table=UkrainianKMU, preserve_case=True, threads=None, chunksize=1000
+):
+    """Transliterates strings from `iterable` in a pool of threads. Works
+    like translit_many, results come back lazily in the input order.
+
+    A compiled table is never changed after it is built, so threads share
+    one without locks. The table is compiled before the threads start,
+    and each thread runs whole chunks of `chunksize` strings through the
+    batch engine, at most two chunks per thread in flight. The regex and
+    str.translate work holds the GIL, so threads only run in parallel on
+    free-threaded builds of Python (3.13t and later); elsewhere prefer
+    translit_parallel. Without concurrent.futures (Python 2 without the
+    futures backport) the strings go through translit_many in the calling
+    thread instead.
+
+    :param iterable: strings to transliterate
+    :param table: transliteration table
+    :param preserve_case: same as for translit
+    :type preserve_case: bool
+    :param threads: number of threads, CPU count by default
+    :type threads: int
+    :param chunksize: number of strings given to a thread at once
+    :type chunksize: int
+    :returns: generator of transliterated strings
+    :raises ValueError: when `chunksize` is less than 1
+
+    >>> print(", ".join(translit_threaded([u"Київ", u"Львів", u"Щука"], threads=2, chunksize=1)))
+    Kyiv, Lviv, Shchuka
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1, got %r" % (chunksize,))
+
+    # Imported here so that plain translit doesn't pay for it
+    import multiprocessing
+    from collections import deque
+
+    try:
+        from concurrent.futures import ThreadPoolExecutor
+    except ImportError:
+        for res in translit_many(iterable, table, preserve_case, chunksize):
+            yield res
+        return
+
+    compiled = get_compiled(table)
+    threads = threads or multiprocessing.cpu_count()
+    items = iter(iterable)
+    pending = deque()
+
+    with ThreadPoolExecutor(threads) as executor:
+        try:
+            while True:
+                chunk = [text_type(src) for src in islice(items, chunksize)]
+                if chunk:
+                    pending.append(
+                        executor.submit(compiled.translit_batch, chunk, preserve_case)
+                    )
+                if pending and (not chunk or len(pending) >= threads * 2):
+                    for res in pending.popleft().result():
+                        yield res
+                elif not chunk:
+                    break
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+CacheInfo = namedtuple(
+    "CacheInfo", ["hits", "misses", "evictions", "size", "bytes", "maxsize", "maxbytes"]
+)
+
+
+class TranslitCache(object):
+    """
+    Thread-safe LRU cache around translit, keyed on the source string,
+    the table and preserve_case. Least recently used entries are evicted
+    once there are more than `maxsize` of them or they take more than
+    `maxbytes` (as reported by sys.getsizeof for source and result).
+    None means no limit.
+
+    >>> cache = TranslitCache(maxsize=2)
+    >>> print("%s %s" % (cache.translit(u"Київ"), cache.translit(u"Київ")))
+    Kyiv Kyiv
+    >>> print("%s %s" % (cache.translit(u"Львів"), cache.translit(u"Харків")))
+    Lviv Kharkiv
+    >>> info = cache.cache_info()
+    >>> print("%d %d %d %d" % (info.hits, info.misses, info.evictions, info.size))
+    1 3 1 2
+    >>> cache.disable(UkrainianKMU)
+    >>> print("%s %d" % (cache.translit(u"Київ"), cache.cache_info().size))
+    Kyiv 0
+    """
+
+    def __init__(self, maxsize=100000, maxbytes=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self._entries = OrderedDict()
+        self._disabled = set()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def translit(self, src, table=UkrainianKMU, preserve_case=True):
+        """Same as translit, but returns the cached result if there is one"""
+        if table in self._disabled:
+            return translit(src, table, preserve_case)
+
+        key = (src, table, preserve_case)
+        with self._lock:
+            res = self._entries.pop(key, None)
+            if res is not None:
+                self._entries[key] = res
+                self.hits += 1
+                return res
+            self.misses += 1
+
+        # Computed outside of the lock, so threads don't wait for each other
+        res = translit(src, table, preserve_case)
+        size = sys.getsizeof(src) + sys.getsizeof(res)
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = res
+                self._bytes += size
+                self._evict()
+
         return res
 
+    __call__ = translit
+
+    def _evict(self):
+        while self._entries and (
+            (self.maxsize is not None and len(self._entries) > self.maxsize)
+            or (self.maxbytes is not None and self._bytes > self.maxbytes)
+        ):
+            (src, _, _), res = self._entries.popitem(last=False)
+            self._bytes -= sys.getsizeof(src) + sys.getsizeof(res)
+            self.evictions += 1
+
+    def cache_info(self):
+        """Returns hits, misses, evictions and current size of the cache"""
+        with self._lock:
+            return CacheInfo(
+                self.hits,
+                self.misses,
+                self.evictions,
+                len(self._entries),
+                self._bytes,
+                self.maxsize,
+                self.maxbytes,
+            )
+
+    def cache_clear(self, table=None):
+        """Drops cached results for the given table or for all of them"""
+        with self._lock:
+            if table is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+
+            for key in [key for key in self._entries if key[1] is table]:
+                res = self._entries.pop(key)
+                self._bytes -= sys.getsizeof(key[0]) + sys.getsizeof(res)
+
+    def disable(self, table):
+        """Stops caching results for the table and drops what's cached"""
+        self._disabled.add(table)
+        self.cache_clear(table)
+
+    def enable(self, table):
+        """Resumes caching results for the table"""
+        self._disabled.discard(table)
+
 
 # For backward compatibility
 translitua = translit
 
 __all__ = [
     "translit",
+    "translit_many",
+    "translit_all",
+    "translit_with_offsets",
+    "translit_tokens",
+    "translit_variants",
+    "translit_chunks",
+    "translit_stream",
+    "translit_parallel",
+    "translit_threaded",
+    "get_table",
+    "get_compiled",
+    "warm_up",
+    "enable_instrumentation",
+    "disable_instrumentation",
+    "TranslitCache",
+    "override_table",
+    "compile_table",
+    "detect_language",
+    "translit_auto",
+    "translit_auto_many",
     "translitua",
     "UkrainianKMU",
     "UkrainianSimple",